@@ -9,4 +9,7 @@ if __name__ == "__main__":
         reload_dirs=["app"],
         reload_includes=[".env"],
         reload=settings.ENVIRONMENT == "local",
+        # 로그인 websocket의 연결 확인은 프로토콜 수준 ping/pong으로 처리
+        ws_ping_interval=settings.LOGIN_WEBSOCKET_PING_INTERVAL,
+        ws_ping_timeout=settings.LOGIN_WEBSOCKET_PING_TIMEOUT,
     )
@@ -0,0 +1,43 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    false positive는 있지만 false negative는 없는 집합입니다.
+    포함 여부가 True면 실제 저장소에서 한 번 더 확인해야 합니다.
+    """
+
+    def __init__(self, size: int, hashes: int) -> None:
+        self.size = size
+        self.hashes = hashes
+        self.count = 0
+        self._bits = bytearray((size + 7) // 8)
+
+    @classmethod
+    def from_capacity(cls, capacity: int, error_rate: float) -> "BloomFilter":
+        size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        hashes = max(1, round(size / capacity * math.log(2)))
+        return cls(size, hashes)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for index in range(self.hashes):
+            yield (first + index * second) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    def clear(self) -> None:
+        self._bits = bytearray(len(self._bits))
+        self.count = 0
@@ -0,0 +1,202 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from enum import StrEnum
+from typing import AsyncIterator
+
+from aiohttp import ClientError
+from fastapi import status
+
+from app.core.config import settings
+from app.core.error import ErrorCode
+from app.core.response import APIError
+from app.logger import use_logger
+
+_circuit_log = use_logger("downstream-guard")
+
+# 이 예외들은 외부 서비스 장애로 보고 circuit breaker 실패로 계산
+FAILURE_EXCEPTIONS = (ClientError, asyncio.TimeoutError, ConnectionError)
+
+
+class CircuitState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_threshold: int,
+        recovery_timeout: float,
+        half_open_max_calls: int = 1,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self._half_open_calls = 0
+
+    def allow(self) -> bool:
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() - self.opened_at < self.recovery_timeout:
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self._half_open_calls = 0
+        if self.state == CircuitState.HALF_OPEN:
+            if self._half_open_calls >= self.half_open_max_calls:
+                return False
+            self._half_open_calls += 1
+        return True
+
+    def release(self) -> None:
+        # 결과를 알 수 없이 끝난 half-open 시험 요청, 상태는 바꾸지 않고 다음 요청이 시험하도록 함
+        if self.state == CircuitState.HALF_OPEN and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        if self.state == CircuitState.HALF_OPEN:
+            self.state = CircuitState.CLOSED
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if (
+            self.state == CircuitState.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            self.state = CircuitState.OPEN
+            self.opened_at = time.monotonic()
+
+
+class GuardedCall:
+    def __init__(self) -> None:
+        self.failed = False
+
+    def fail(self) -> None:
+        self.failed = True
+
+
+class DownstreamGuard:
+    """
+    외부 서비스 하나에 대한 동시 요청 수 제한(bulkhead)과 circuit breaker입니다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        queue_timeout: float,
+        breaker: CircuitBreaker,
+    ) -> None:
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.breaker = breaker
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.counters = {
+            "success": 0,
+            "failure": 0,
+            "rejected_open": 0,
+            "rejected_full": 0,
+            "aborted": 0,
+        }
+
+    def _unavailable(self) -> APIError:
+        return APIError(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            error_code=ErrorCode.SERVICE_UNAVAILABLE,
+            message="외부 서비스가 응답하지 않습니다. 잠시 후 다시 시도해주세요.",
+            error_data={"service": self.name},
+        )
+
+    @asynccontextmanager
+    async def call(self) -> AsyncIterator[GuardedCall]:
+        if not self.breaker.allow():
+            self.counters["rejected_open"] += 1
+            raise self._unavailable()
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.counters["rejected_full"] += 1
+            # half-open 시험 요청이 실행되지 못했으므로 다음 요청이 다시 시험하도록 함
+            if self.breaker.state == CircuitState.HALF_OPEN:
+                self.breaker.record_failure()
+            raise self._unavailable()
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        guarded_call = GuardedCall()
+        completed = False
+        try:
+            yield guarded_call
+        except FAILURE_EXCEPTIONS:
+            guarded_call.fail()
+            raise
+        else:
+            completed = True
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+            previous_state = self.breaker.state
+            if guarded_call.failed:
+                self.counters["failure"] += 1
+                self.breaker.record_failure()
+            elif completed:
+                self.counters["success"] += 1
+                self.breaker.record_success()
+            else:
+                # 취소되었거나 외부 서비스 장애가 아닌 예외로 끝난 요청은 성공으로 세지 않음
+                self.counters["aborted"] += 1
+                self.breaker.release()
+            if previous_state != self.breaker.state:
+                _circuit_log.info(
+                    f"{self.name} circuit {previous_state} -> {self.breaker.state}"
+                )
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.breaker.state.value,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_concurrency": self.max_concurrency,
+            **self.counters,
+        }
+
+
+class DownstreamRegistry:
+    def __init__(self) -> None:
+        self._guards: dict[str, DownstreamGuard] = {}
+
+    def get(self, name: str) -> DownstreamGuard:
+        guard = self._guards.get(name)
+        if guard is None:
+            guard = DownstreamGuard(
+                name=name,
+                max_concurrency=settings.DOWNSTREAM_CONCURRENCY_LIMIT,
+                queue_timeout=settings.DOWNSTREAM_QUEUE_TIMEOUT,
+                breaker=CircuitBreaker(
+                    failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+                    recovery_timeout=settings.CIRCUIT_RECOVERY_TIMEOUT,
+                ),
+            )
+            self._guards[name] = guard
+        return guard
+
+    def snapshot(self) -> dict[str, dict]:
+        return {name: guard.snapshot() for name, guard in self._guards.items()}
+
+
+guards = DownstreamRegistry()
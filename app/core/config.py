@@ -2,6 +2,7 @@ import secrets
 from typing import Literal, Any, Annotated
 from pydantic import (
     field_validator,
+    model_validator,
     BeforeValidator,
 )
 
@@ -53,6 +54,63 @@ class Settings(BaseSettings):
     VERCEL_CLIENT_ID: str
     VERCEL_CLIENT_SECRET: str
 
+    CLOUDFLARE_API_URL: str = "https://api.cloudflare.com/client/v4"
+    DISCORD_API_URL: str = "https://discord.com/api/v10"
+    EMAIL_API_URL: str = "https://api.forwardemail.net/v1"
+    VERCEL_API_URL: str = "https://api.vercel.com"
+
+    HTTP_CONNECTION_LIMIT: int = 100
+    HTTP_CONNECTION_LIMIT_PER_HOST: int = 20
+    HTTP_DNS_CACHE_TTL: int = 300
+    HTTP_KEEPALIVE_TIMEOUT: float = 30
+    HTTP_REQUEST_TIMEOUT: float = 30
+
+    DOWNSTREAM_CONCURRENCY_LIMIT: int = 20
+    DOWNSTREAM_QUEUE_TIMEOUT: float = 5
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RECOVERY_TIMEOUT: float = 30
+
+    # opaque: Redis에 저장된 랜덤 토큰, jwt: SECRET_KEY로 서명한 짧은 access token + refresh token
+    USER_TOKEN_MODE: Literal["opaque", "jwt"] = "opaque"
+    USER_ACCESS_TOKEN_TTL: int = 900
+    TOKEN_REVOCATION_CAPACITY: int = 100000
+    TOKEN_REVOCATION_ERROR_RATE: float = 0.001
+
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL: float = 60
+
+    # /status/runtime 조회용 토큰, 설정하지 않으면 조회할 수 없음
+    STATUS_API_TOKEN: str | None = None
+
+    LOGIN_WEBSOCKET_MAX_CONNECTIONS: int = 5000
+    LOGIN_WEBSOCKET_PING_INTERVAL: float = 20
+    LOGIN_WEBSOCKET_PING_TIMEOUT: float = 20
+    LOGIN_WEBSOCKET_IDLE_TIMEOUT: float = 60
+
+    # Discord 로그 버퍼, overflow: block(기다린 뒤 spill), spill(Redis에 임시 저장), drop
+    DISCORD_LOG_BUFFER_SIZE: int = 1000
+    DISCORD_LOG_FLUSH_INTERVAL: float = 2
+    DISCORD_LOG_OVERFLOW: Literal["block", "spill", "drop"] = "spill"
+    DISCORD_LOG_BLOCK_TIMEOUT: float = 5
+
+    CLOUDFLARE_RECORD_INDEX_TTL: int = 300
+    CLOUDFLARE_RECORD_PAGE_SIZE: int = 1000
+    CLOUDFLARE_RECORD_PAGE_CONCURRENCY: int = 4
+    CLOUDFLARE_BATCH_SIZE: int = 200
+    # Cloudflare 전역 제한: 5분에 1200회
+    CLOUDFLARE_RATE_LIMIT: int = 1200
+    CLOUDFLARE_RATE_PERIOD: int = 300
+    CLOUDFLARE_RATE_BURST: int = 100
+    CLOUDFLARE_RATE_MAX_WAIT: float = 30
+    CLOUDFLARE_MAX_RETRIES: int = 3
+    CLOUDFLARE_READ_REUSE_SECONDS: float = 0
+
+    # 0이면 DNS 정합성 검사를 실행하지 않음
+    DNS_RECONCILE_INTERVAL: int = 3600
+    DNS_RECONCILE_CHUNK_SIZE: int = 500
+    DNS_RECONCILE_CONCURRENCY: int = 2
+    DNS_RECONCILE_REPAIR: bool = False
+
     @staticmethod
     @field_validator("SERVER_PORT")
     def check_port_range(value: int):
@@ -60,5 +118,12 @@ class Settings(BaseSettings):
             raise ValueError("SERVER_PORT number must be between 1 and 65535")
         return value
 
+    @model_validator(mode="after")
+    def check_token_secret(self):
+        # 기본 SECRET_KEY는 워커마다 달라 다른 워커에서 발급한 토큰을 검증할 수 없음
+        if self.USER_TOKEN_MODE == "jwt" and "SECRET_KEY" not in self.model_fields_set:
+            raise ValueError("SECRET_KEY must be set when USER_TOKEN_MODE is jwt")
+        return self
+
 
 settings = Settings()
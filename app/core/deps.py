@@ -1,13 +1,17 @@
+import hmac
+
 import redis.exceptions
 from dependency_injector.wiring import Provide, inject
 
 from fastapi import Depends, HTTPException, status, Request, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from app.core.config import settings
 from app.entity.user import User as UserEntity
 from app.logger import use_logger
 from app.service.container import ServiceContainer
 from app.service.session import UserSessionService
+from app.service.user_cache import UserCacheService
 
 
 security = HTTPBearer(scheme_name="Access Token")
@@ -19,87 +23,91 @@ def get_user_token(request: Request) -> str:
     return header_value.split(" ")[1]
 
 
+def _invalid_token() -> HTTPException:
+    _log.error("Invalid authentication token")
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid authentication token",
+    )
+
+
+def _redis_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail="Internal server error",
+    )
+
+
+async def verify_status_token(
+    credentials: HTTPAuthorizationCredentials | None = Depends(
+        HTTPBearer(scheme_name="Status Token", auto_error=False)
+    ),
+) -> None:
+    if not settings.STATUS_API_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Status API is disabled"
+        )
+    if credentials is None or not hmac.compare_digest(
+        credentials.credentials.encode(), settings.STATUS_API_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid status token",
+        )
+
+
+async def _authenticate_user(
+    token: str,
+    user_session: UserSessionService,
+    user_cache: UserCacheService,
+    refresh: bool = True,
+) -> UserEntity:
+    try:
+        user_id = await user_session.authenticate(token, refresh=refresh)
+    except redis.exceptions.RedisError:
+        raise _redis_error()
+    if user_id is None:
+        raise _invalid_token()
+
+    _log.info(f"User ID: {user_id}")
+    user = await user_cache.get(user_id)
+    if user is None:
+        _log.error("User not found")
+        raise _invalid_token()
+    return user
+
+
 @inject
 async def get_current_user_id(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     user_session: UserSessionService = Depends(Provide[ServiceContainer.user_session]),
 ) -> str:
     try:
-        token = credentials.credentials
-        if await user_session.exist_token(token) is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication token",
-            )
-
-        user_id = await user_session.get_user_id(token)
-
-        return user_id
+        user_id = await user_session.authenticate(credentials.credentials)
     except redis.exceptions.RedisError:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error",
-        )
+        raise _redis_error()
+    if user_id is None:
+        raise _invalid_token()
+    return user_id
 
 
 @inject
 async def get_query_user_entity(
     token: str = Query(...),
     user_session: UserSessionService = Depends(Provide[ServiceContainer.user_session]),
+    user_cache: UserCacheService = Depends(Provide[ServiceContainer.user_cache]),
 ) -> tuple[UserEntity, str] | None:
-    try:
-        if await user_session.exist_token(token) is None:
-            _log.error("Invalid authentication token")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication token",
-            )
-
-        _log.info(f"Token: {token}")
-
-        user_id = await user_session.get_user_id(token)
-        _log.info(f"User ID: {user_id}")
-
-        if not await UserEntity.exists(id=str(user_id)):
-            _log.error("User not found")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication token",
-            )
-
-        await user_session.update_token(token)
-
-        return await UserEntity.get(id=user_id), token
-    except redis.exceptions.RedisError:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error",
-        )
+    return await _authenticate_user(token, user_session, user_cache), token
 
 
 @inject
 async def get_user_token(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     user_session: UserSessionService = Depends(Provide[ServiceContainer.user_session]),
+    user_cache: UserCacheService = Depends(Provide[ServiceContainer.user_cache]),
 ) -> str:
     token = credentials.credentials
-    if await user_session.exist_token(token) is None:
-        _log.error("Invalid authentication token")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication token",
-        )
-
-    user_id = await user_session.get_user_id(token)
-    _log.info(f"User ID: {user_id}")
-
-    if not await UserEntity.exists(id=str(user_id)):
-        _log.error("User not found")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication token",
-        )
-
+    await _authenticate_user(token, user_session, user_cache, refresh=False)
     return token
 
 
@@ -107,33 +115,16 @@ async def get_user_token(
 async def get_current_user_entity(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     user_session: UserSessionService = Depends(Provide[ServiceContainer.user_session]),
+    user_cache: UserCacheService = Depends(Provide[ServiceContainer.user_cache]),
 ) -> UserEntity | None:
-    try:
-        token = credentials.credentials
-        if await user_session.exist_token(token) is None:
-            _log.error("Invalid authentication token")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication token",
-            )
-
-        _log.info(f"Token: {token}")
+    return await _authenticate_user(credentials.credentials, user_session, user_cache)
 
-        user_id = await user_session.get_user_id(token)
-        _log.info(f"User ID: {user_id}")
 
-        if not await UserEntity.exists(id=str(user_id)):
-            _log.error("User not found")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication token",
-            )
-
-        await user_session.update_token(token)
-
-        return await UserEntity.get(id=user_id)
-    except redis.exceptions.RedisError:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error",
-        )
+@inject
+async def get_current_session(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_session: UserSessionService = Depends(Provide[ServiceContainer.user_session]),
+    user_cache: UserCacheService = Depends(Provide[ServiceContainer.user_cache]),
+) -> tuple[UserEntity, str]:
+    token = credentials.credentials
+    return await _authenticate_user(token, user_session, user_cache), token
@@ -7,6 +7,7 @@ class ErrorCode(str, Enum):
     INTERNAL_SERVER_ERROR = "INTERNAL_SERVER_ERROR"
     DNS_SERVER_ERROR = "DNS_SERVER_ERROR"
     INVALID_IDENTITY = "INVALID_IDENTITY"
+    SERVICE_UNAVAILABLE = "SERVICE_UNAVAILABLE"
 
     INVALID_GOOGLE_CREDENTIALS = "INVALID_GOOGLE_CREDENTIALS"
     INVALID_SESSION = "INVALID_SESSION"
@@ -0,0 +1,57 @@
+from typing import Any
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+from app.core.config import settings
+from app.logger import use_logger
+
+_log = use_logger("http-session-manager")
+
+
+class HTTPSessionManager:
+    """
+    외부 API 호출에 쓰는 aiohttp 세션을 관리합니다.
+    모든 세션은 하나의 커넥션 풀(TCPConnector)을 공유하며, lifespan에서 열고 닫습니다.
+    """
+
+    def __init__(self) -> None:
+        self._connector: TCPConnector | None = None
+        self._sessions: dict[str, ClientSession] = {}
+
+    async def open(self) -> None:
+        if self._connector is not None:
+            return
+        self._connector = TCPConnector(
+            limit=settings.HTTP_CONNECTION_LIMIT,
+            limit_per_host=settings.HTTP_CONNECTION_LIMIT_PER_HOST,
+            ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+            keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+        )
+        _log.info("HTTP connection pool opened")
+
+    def session(self, name: str, **kwargs: Any) -> ClientSession:
+        """
+        이름별로 세션을 하나씩 만들어 재사용합니다.
+        kwargs(headers, auth 등)는 세션을 처음 만들 때만 적용됩니다.
+        """
+        if self._connector is None:
+            raise RuntimeError("HTTP connection pool is not opened")
+        session = self._sessions.get(name)
+        if session is None or session.closed:
+            session = ClientSession(
+                connector=self._connector,
+                connector_owner=False,
+                timeout=ClientTimeout(total=settings.HTTP_REQUEST_TIMEOUT),
+                **kwargs,
+            )
+            self._sessions[name] = session
+        return session
+
+    async def close(self) -> None:
+        for session in self._sessions.values():
+            await session.close()
+        self._sessions.clear()
+        if self._connector is not None:
+            await self._connector.close()
+            self._connector = None
+        _log.info("HTTP connection pool closed")
@@ -0,0 +1,119 @@
+import asyncio
+import contextlib
+from typing import Awaitable, Callable
+
+import redis.exceptions
+from sentry_sdk import capture_exception
+
+from app.core.redis import manager
+from app.logger import use_logger
+
+_pubsub_log = use_logger("redis-pubsub")
+
+MessageHandler = Callable[[bytes], Awaitable[None]]
+ReconnectHandler = Callable[[], Awaitable[None]]
+
+
+class RedisPubSubHub:
+    """
+    워커마다 Redis pub/sub 연결 하나를 열고, 받은 메시지를 채널별 handler로 전달합니다.
+    연결이 끊겼다가 다시 연결되면 그 사이 메시지를 놓쳤을 수 있으므로 reconnect handler를 호출합니다.
+    """
+
+    RECONNECT_DELAY = 1.0
+
+    def __init__(self) -> None:
+        self.redis = manager.get_connection()
+        self._handlers: dict[str, list[MessageHandler]] = {}
+        self._reconnect_handlers: list[ReconnectHandler] = []
+        self._pubsub = None
+        # 구독한 채널이 없으면 pub/sub 연결이 열리지 않으므로 첫 구독까지 대기
+        self._has_channels = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        handlers = self._handlers.setdefault(channel, [])
+        handlers.append(handler)
+        if self._pubsub is not None and len(handlers) == 1:
+            await self._pubsub.subscribe(channel)
+        self._has_channels.set()
+
+    async def unsubscribe(self, channel: str, handler: MessageHandler) -> None:
+        handlers = self._handlers.get(channel, [])
+        if handler in handlers:
+            handlers.remove(handler)
+        if not handlers:
+            self._handlers.pop(channel, None)
+            if self._pubsub is not None:
+                await self._pubsub.unsubscribe(channel)
+
+    def on_reconnect(self, handler: ReconnectHandler) -> None:
+        self._reconnect_handlers.append(handler)
+
+    async def publish(self, channel: str, message: str | bytes) -> int:
+        return await self.redis.publish(channel, message)
+
+    async def _dispatch(self, channel: str, data: bytes) -> None:
+        for handler in list(self._handlers.get(channel, [])):
+            try:
+                await handler(data)
+            except Exception as e:
+                capture_exception(e)
+                _pubsub_log.error(f"Handler for {channel} failed: {e}")
+
+    async def _connect(self) -> None:
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        if self._handlers:
+            await pubsub.subscribe(*self._handlers)
+        self._pubsub = pubsub
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                if self._pubsub is None:
+                    await self._connect()
+                    _pubsub_log.info("Pub/sub reconnected")
+                    for handler in self._reconnect_handlers:
+                        await handler()
+                await self._has_channels.wait()
+                if self._pubsub.connection is None:
+                    await self._pubsub.subscribe(*self._handlers)
+                while True:
+                    message = await self._pubsub.get_message(timeout=1.0)
+                    if message is None or message["type"] != "message":
+                        continue
+                    await self._dispatch(
+                        message["channel"].decode("utf-8"), message["data"]
+                    )
+            except Exception as e:
+                # CancelledError 외의 오류로 listener가 끝나면 캐시 무효화, 토큰 폐기 전파,
+                # 로그인 알림이 멈추므로 연결을 버리고 다시 연결
+                if isinstance(e, (redis.exceptions.ConnectionError, OSError)):
+                    _pubsub_log.error(f"Pub/sub connection lost: {e}")
+                else:
+                    capture_exception(e)
+                    _pubsub_log.error(f"Pub/sub listener failed: {e}")
+                pubsub, self._pubsub = self._pubsub, None
+                if pubsub is not None:
+                    with contextlib.suppress(Exception):
+                        await pubsub.aclose()
+            await asyncio.sleep(self.RECONNECT_DELAY)
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        # 시작 직후 발행된 메시지를 놓치지 않도록 구독을 마친 뒤 반환
+        await self._connect()
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        pubsub, self._pubsub = self._pubsub, None
+        if pubsub is not None:
+            with contextlib.suppress(Exception):
+                await pubsub.aclose()
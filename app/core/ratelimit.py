@@ -0,0 +1,86 @@
+import asyncio
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from app.core.redis import manager
+
+# KEYS[1]: bucket
+# ARGV[1]: 초당 충전량, ARGV[2]: 최대 토큰 수, ARGV[3]: 최대 대기 시간(ms)
+# 토큰을 미리 예약하고 사용 가능해질 때까지 기다려야 하는 시간(ms)을 반환합니다.
+# 최대 대기 시간을 넘으면 예약하지 않고 -1을 반환합니다.
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1]) / 1000
+local burst = tonumber(ARGV[2])
+local max_wait = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or burst
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+
+local wait = 0
+if tokens < 1 then
+    wait = math.ceil((1 - tokens) / rate)
+    if wait > max_wait then
+        return -1
+    end
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens - 1, 'updated_at', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate) + wait)
+return wait
+"""
+
+
+class RedisTokenBucket:
+    """
+    여러 워커가 Redis의 토큰 버킷 하나를 공유합니다.
+    토큰이 부족하면 실패하는 대신 차례가 올 때까지 기다립니다.
+    """
+
+    def __init__(self, key: str, rate: float, burst: int, max_wait: float) -> None:
+        self.key = key
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self.redis = manager.get_connection()
+        self._script = self.redis.register_script(_TOKEN_BUCKET_SCRIPT)
+
+    async def acquire(self) -> bool:
+        wait_ms = await self._script(
+            keys=[self.key],
+            args=[self.rate, self.burst, int(self.max_wait * 1000)],
+        )
+        if wait_ms < 0:
+            return False
+        if wait_ms:
+            await asyncio.sleep(wait_ms / 1000)
+        return True
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(
+    attempt: int,
+    retry_after: str | None = None,
+    base: float = 0.5,
+    cap: float = 30.0,
+) -> float:
+    delay = parse_retry_after(retry_after)
+    if delay is not None:
+        return min(cap, delay)
+    return random.uniform(0, min(cap, base * 2**attempt))
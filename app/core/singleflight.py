@@ -0,0 +1,48 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    같은 key로 동시에 들어온 호출을 하나의 요청으로 합칩니다.
+    reuse_seconds가 0보다 크면 완료된 결과를 그 시간 동안 재사용합니다.
+    """
+
+    def __init__(self, reuse_seconds: float = 0) -> None:
+        self.reuse_seconds = reuse_seconds
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self._results: dict[Hashable, tuple[float, Any]] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        loop = asyncio.get_running_loop()
+        cached = self._results.get(key)
+        if cached is not None:
+            expires_at, result = cached
+            if expires_at > loop.time():
+                return result
+            del self._results[key]
+
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._complete(key, done))
+        # 한 호출자가 취소되어도 같은 요청을 기다리는 다른 호출자에게 영향이 없도록 shield
+        return await asyncio.shield(future)
+
+    def _complete(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        if self.reuse_seconds <= 0 or future.cancelled() or future.exception():
+            return
+        loop = asyncio.get_running_loop()
+        entry = (loop.time() + self.reuse_seconds, future.result())
+        self._results[key] = entry
+        # 다시 조회되지 않는 key도 남지 않도록 만료 시각에 삭제
+        loop.call_later(self.reuse_seconds, self._expire, key, entry)
+
+    def _expire(self, key: Hashable, entry: tuple[float, Any]) -> None:
+        if self._results.get(key) is entry:
+            del self._results[key]
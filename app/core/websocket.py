@@ -1,32 +1,177 @@
-from fastapi import WebSocket
+import asyncio
+import contextlib
+import time
+
+from fastapi import WebSocket, status
 from app.logger import use_logger
 
 logger = use_logger("websocket")
 
 
+class _Connection:
+    __slots__ = ("websocket", "deadline", "heartbeat", "last_seen", "responsive")
+
+    def __init__(self, websocket: WebSocket, deadline: float, heartbeat: bool) -> None:
+        self.websocket = websocket
+        self.deadline = deadline
+        # 앱 수준 ping 메시지를 받기로 한 클라이언트
+        self.heartbeat = heartbeat
+        self.last_seen = time.monotonic()
+        # heartbeat에 한 번이라도 응답한 클라이언트만 idle timeout을 적용
+        self.responsive = False
+
+
 class ConnectionManager:
-    def __init__(self):
-        self.subscribe_websocket: dict[str, WebSocket] = {}
+    """
+    로그인 세션을 기다리는 websocket 목록입니다.
+    최대 연결 수를 넘으면 새 연결을 거절하고, 주기적으로 세션이 만료된 연결을 정리합니다.
+    연결이 살아 있는지는 uvicorn의 프로토콜 수준 ping/pong으로 확인하며,
+    앱 수준 ping 메시지는 heartbeat를 요청한 클라이언트에게만 보내고 응답이 없으면 정리합니다.
+    """
+
+    # 느린 연결 하나가 정리 작업 전체를 막지 않도록 연결별 전송 제한 시간(초)
+    SEND_TIMEOUT = 5
+
+    def __init__(
+        self,
+        max_connections: int = 5000,
+        ping_interval: float = 20,
+        idle_timeout: float = 60,
+    ):
+        self.subscribe_websocket: dict[str, _Connection] = {}
+        self.max_connections = max_connections
+        self.ping_interval = ping_interval
+        self.idle_timeout = idle_timeout
+        self.counters = {"rejected": 0, "expired": 0, "idle": 0, "failed": 0}
+        self._task: asyncio.Task | None = None
 
     def get_all_connection(self):
-        return self.subscribe_websocket
+        return {
+            session_id: connection.websocket
+            for session_id, connection in self.subscribe_websocket.items()
+        }
 
     def exist(self, session_id: str):
         return session_id in self.subscribe_websocket
 
-    async def connect(self, session_id: str, websocket: WebSocket):
-        self.subscribe_websocket[session_id] = websocket
+    async def connect(
+        self,
+        session_id: str,
+        websocket: WebSocket,
+        expires_in: float,
+        heartbeat: bool = False,
+    ) -> bool:
+        if (
+            session_id not in self.subscribe_websocket
+            and len(self.subscribe_websocket) >= self.max_connections
+        ):
+            self.counters["rejected"] += 1
+            return False
+        self.subscribe_websocket[session_id] = _Connection(
+            websocket, time.monotonic() + expires_in, heartbeat
+        )
+        return True
+
+    def touch(self, session_id: str, websocket: WebSocket) -> None:
+        connection = self.subscribe_websocket.get(session_id)
+        if connection is not None and connection.websocket is websocket:
+            connection.last_seen = time.monotonic()
+            connection.responsive = True
 
     async def send_message(self, session_id: str, message: dict):
         try:
-            await self.subscribe_websocket[session_id].send_json(message)
+            await self.subscribe_websocket[session_id].websocket.send_json(message)
         except RuntimeError:
             logger.info(f"Session {session_id} is already closed")
             pass
 
     async def disconnect(self, session_id: str, **kwargs):
-        await self.subscribe_websocket[session_id].close(**kwargs)
-        del self.subscribe_websocket[session_id]
+        connection = self.subscribe_websocket.pop(session_id)
+        await connection.websocket.close(**kwargs)
+
+    def remove(self, session_id: str):
+        self.subscribe_websocket.pop(session_id, None)
+
+    def get(self, session_id: str) -> WebSocket | None:
+        connection = self.subscribe_websocket.get(session_id)
+        return connection.websocket if connection is not None else None
 
     async def get_connection(self, session_id: str):
-        return self.subscribe_websocket[session_id]
+        return self.subscribe_websocket[session_id].websocket
+
+    async def _reap(self, session_id: str, counter: str, **kwargs) -> None:
+        self.counters[counter] += 1
+        connection = self.subscribe_websocket.pop(session_id, None)
+        if connection is None:
+            return
+        with contextlib.suppress(Exception):
+            async with asyncio.timeout(self.SEND_TIMEOUT):
+                await connection.websocket.close(**kwargs)
+
+    async def _check(self, session_id: str, connection: _Connection, now: float):
+        if self.subscribe_websocket.get(session_id) is not connection:
+            return
+        if connection.deadline <= now:
+            await self._reap(
+                session_id,
+                "expired",
+                code=status.WS_1000_NORMAL_CLOSURE,
+                reason="Session expired",
+            )
+        elif not connection.heartbeat:
+            return
+        elif connection.responsive and now - connection.last_seen > self.idle_timeout:
+            await self._reap(
+                session_id,
+                "idle",
+                code=status.WS_1001_GOING_AWAY,
+                reason="Heartbeat timeout",
+            )
+        else:
+            try:
+                async with asyncio.timeout(self.SEND_TIMEOUT):
+                    await connection.websocket.send_json({"message": "ping"})
+            except Exception:
+                await self._reap(session_id, "failed")
+
+    async def reap(self) -> None:
+        now = time.monotonic()
+        await asyncio.gather(
+            *(
+                self._check(session_id, connection, now)
+                for session_id, connection in list(self.subscribe_websocket.items())
+            )
+        )
+
+    async def _reap_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            try:
+                await self.reap()
+            except Exception as e:
+                logger.error(f"Websocket reaper failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "open": len(self.subscribe_websocket),
+            "max_connections": self.max_connections,
+            **self.counters,
+        }
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._reap_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        for session_id in list(self.subscribe_websocket):
+            with contextlib.suppress(Exception):
+                await self.disconnect(
+                    session_id,
+                    code=status.WS_1001_GOING_AWAY,
+                    reason="Server shutting down",
+                )
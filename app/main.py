@@ -78,14 +78,43 @@ def bootstrap() -> FastAPI:
             ]
         )
         _log.info("Container Wiring complete")
+        http_session_manager = container.http()
+        await http_session_manager.open()
+        discord = container.discord()
+        await discord.start()
+        pubsub = container.pubsub()
+        await pubsub.start()
+        await container.user_cache().start()
+        websocket_manager = container.websocket()
+        await websocket_manager.start()
+        token_revocation = container.token_revocation()
+        if settings.USER_TOKEN_MODE == "jwt":
+            await token_revocation.start()
+        record_index = container.record_index()
+        await record_index.start(
+            zone_ids=await container.localdb().zone_ids(),
+            loader=container.cloudflare().fetch_all_records,
+        )
         async with RegisterTortoise(
             app=application,
             config=tortoise_config,
             generate_schemas=True,
             add_exception_handlers=True,
         ):
+            reconcile_service = container.reconcile()
+            await reconcile_service.start()
+            login_events = container.login_events()
+            await login_events.start()
             yield
+            await login_events.stop()
+            await reconcile_service.stop()
         _log.info("Shutting down application")
+        await record_index.stop()
+        await websocket_manager.stop()
+        await token_revocation.stop()
+        await pubsub.stop()
+        await discord.stop()
+        await http_session_manager.close()
         await Tortoise.close_connections()
         _log.info("Application shutdown complete")
 
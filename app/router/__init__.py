@@ -1,13 +1,20 @@
 from dependency_injector.wiring import inject, Provide
 from fastapi import APIRouter, Depends
 
+from app.core.circuit import guards
+from app.core.deps import verify_status_token
+from app.core.websocket import ConnectionManager
 from app.router.auth import router as auth_router
 from app.router.domain import router as domain_router
 from app.router.discord import router as discord_router
 from app.router.transfer import router as transfer_router
 from app.router.application import router as application_router
 from app.service.container import ServiceContainer
+from app.service.discord_interaction import DiscordRequester
 from app.service.domain import DomainService
+from app.service.login_events import LoginEventService
+from app.service.token_revocation import TokenRevocationService
+from app.service.user_cache import UserCacheService
 
 router = APIRouter(
     responses={404: {"description": "Not found"}},
@@ -28,6 +35,28 @@ async def get_status(
     return entity_status
 
 
+@router.get("/status/runtime", dependencies=[Depends(verify_status_token)])
+@inject
+async def get_runtime_status(
+    user_cache: UserCacheService = Depends(Provide[ServiceContainer.user_cache]),
+    websocket: ConnectionManager = Depends(Provide[ServiceContainer.websocket]),
+    login_events: LoginEventService = Depends(Provide[ServiceContainer.login_events]),
+    discord: DiscordRequester = Depends(Provide[ServiceContainer.discord]),
+    token_revocation: TokenRevocationService = Depends(
+        Provide[ServiceContainer.token_revocation]
+    ),
+) -> dict:
+    return {
+        "downstream": guards.snapshot(),
+        "user_cache": user_cache.stats(),
+        "token_revocation": token_revocation.stats(),
+        "login_websocket": websocket.stats(),
+        "login_events": login_events.stats(),
+        "discord_log": discord.log_sink.stats(),
+        "discord_sender": discord.sender.stats(),
+    }
+
+
 router.include_router(auth_router)
 router.include_router(domain_router)
 router.include_router(discord_router)
@@ -1,3 +1,4 @@
+import asyncio
 import uuid
 from typing import Literal
 
@@ -8,12 +9,15 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi_restful.cbv import cbv
 from starlette.responses import RedirectResponse, HTMLResponse
-from starlette.websockets import WebSocketDisconnect
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from starlette.websockets import WebSocket
 
-from app.core.deps import get_current_user_entity, get_user_token
+from app.core.deps import (
+    get_current_session,
+    get_current_user_entity,
+    get_user_token,
+)
 from app.core.string import (
     parse_application_url,
     create_application_redirect_url,
@@ -24,10 +28,9 @@ from app.entity import User
 from app.core.error import ErrorCode
 from app.core.response import APIResponse, APIError
 from app.service.container import ServiceContainer
-from app.service.email import EmailRequesterService
 from app.service.google import GoogleRequestService
+from app.service.login_events import LoginEventService
 from app.service.session import LoginSessionService, UserSessionService
-from app.service.discord_interaction import DiscordRequester
 from app.logger import use_logger
 from app.core.redis import settings
 
@@ -59,17 +62,17 @@ class AuthController:
             Provide[ServiceContainer.login_session]
         ),
     ) -> RedirectResponse:
-        if not await login_service.exist_session(session_id):
+        login_session = await login_service.get_session(session_id)
+        if login_session is None:
             raise APIError(
                 status_code=status.HTTP_404_NOT_FOUND,
                 error_code=ErrorCode.INVALID_SESSION,
                 message="Session not found",
             )
-        session_type = await login_service.get_session_type(session_id)
         url = await google_service.get_authorization_url(session_id)
-        if session_type == "login":
+        if login_session.type == "login":
             return RedirectResponse(url=url)
-        elif session_type == "application":
+        elif login_session.type == "application":
             callback_url = create_callback_url(session_id=session_id, without_code=True)
             return RedirectResponse(url=callback_url)
 
@@ -104,13 +107,26 @@ class AuthController:
         user_session: UserSessionService = Depends(
             Provide[ServiceContainer.user_session]
         ),
-        discord_service: DiscordRequester = Depends(Provide[ServiceContainer.discord]),
-        email_service: EmailRequesterService = Depends(Provide[ServiceContainer.email]),
+        login_events: LoginEventService = Depends(
+            Provide[ServiceContainer.login_events]
+        ),
     ) -> HTMLResponse:
+        login_session = await login_service.get_session(session_id)
+        if login_session is None:
+            return templates.TemplateResponse(
+                request=request,
+                name="login.html",
+                context={
+                    "status": "failed",
+                    "message": f"알 수 없는 세션",
+                    "detail": "로그인 세션을 찾을 수 없습니다.",
+                    "login_data": session_id,
+                },
+            )
+
         if not code == "noauth":
             try:
-                credentials = await google_service.fetch_user_credentials(code)
-                user_data = await google_service.fetch_user_info(credentials)
+                user_data = await google_service.fetch_user_profile(code)
             except aiogoogle.excs.HTTPError as e:
                 _log.error(f"Google API Error: {e.res}")
                 return templates.TemplateResponse(
@@ -131,40 +147,19 @@ class AuthController:
                     email=user_data["email"],
                     avatar=user_data["picture"],
                 )
-                await discord_service.create_log_user_create(
+                await login_events.user_created(
                     email=user_data["email"],
                     name=user_data["name"],
                     avatar=user_data["picture"],
                 )
-                await email_service.send_welcome_email(
-                    to_email=user_data["email"],
-                    name=user_data["name"],
-                )
             else:
                 user_entity = await User.filter(email=user_data["email"]).first()
 
         else:
-            stored_user_id = await login_service.get_session_user_id(session_id)
-            user_entity = await User.get(id=stored_user_id)
+            user_entity = await User.get(id=login_session.user_id)
 
-        if not await login_service.exist_session(session_id=session_id):
-            return templates.TemplateResponse(
-                request=request,
-                name="login.html",
-                context={
-                    "status": "failed",
-                    "message": f"알 수 없는 세션",
-                    "detail": "로그인 세션을 찾을 수 없습니다.",
-                    "login_data": session_id,
-                },
-            )
-
-        login_type = await login_service.get_session_type(session_id)
-        if login_type == "application":
-            application_url = await login_service.get_session_application_url(
-                session_id
-            )
-            parsed_data = parse_application_url(application_url)
+        if login_session.type == "application":
+            parsed_data = parse_application_url(login_session.application_url)
             if not parsed_data["application"] in ["vercel", "transfer"]:
                 return templates.TemplateResponse(
                     request=request,
@@ -177,7 +172,9 @@ class AuthController:
                     },
                 )
             new_access_token = await user_session.create_new_token(str(user_entity.id))
-            await login_service.push_token_to_session(session_id, new_access_token)
+            await login_service.push_token_to_session(
+                session_id, {"access_token": new_access_token}
+            )
             parsed_data["parameters"].update({"token": new_access_token})
             redirect_url = create_application_redirect_url(
                 base_url=settings.BACKEND_HOST,
@@ -229,17 +226,21 @@ class AuthController:
                     ),
                 },
             )
-        elif login_type == "login":
+        elif login_session.type == "login":
             await login_service.set_session_user(
                 session_id=session_id, user_id=str(user_entity.id)
             )
-            await discord_service.create_log_refresh_session(user=user_entity)
-            if login_service.exist_subscriber(session_id):
-                new_access_token = await user_session.create_new_token(
-                    str(user_entity.id)
-                )
-                await login_service.push_token_to_session(session_id, new_access_token)
-                await login_service.delete_session(session_id)
+            has_subscriber = await login_service.exist_subscriber(session_id)
+            # 세션을 조회하는 요청이 이미 발급을 선점했다면 발급하지 않음
+            if has_subscriber and await login_service.claim_token_issue(session_id):
+                tokens = await user_session.create_token_pair(str(user_entity.id))
+                if await login_service.push_token_to_session(session_id, tokens):
+                    await login_service.delete_session(session_id)
+                else:
+                    # 그 사이 구독자가 끊겼으면 세션 조회로 다시 발급받음
+                    await user_session.delete_token(tokens["access_token"])
+                    await login_service.release_token_issue(session_id)
+            await login_events.session_refreshed(str(user_entity.id))
             return templates.TemplateResponse(
                 request=request,
                 name="login.html",
@@ -274,26 +275,70 @@ class AuthController:
             Provide[ServiceContainer.user_session]
         ),
     ) -> APIResponse[dict]:
-        if not await login_service.exist_session(session_id):
+        login_session = await login_service.get_session(session_id)
+        if login_session is None:
             raise APIError(
                 status_code=status.HTTP_404_NOT_FOUND,
                 error_code=ErrorCode.INVALID_SESSION,
                 message="Session not found",
             )
-        user_id = await login_service.get_session_user_id(session_id)
 
-        if not user_id:
+        if not login_session.user_id:
             raise APIError(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 error_code=ErrorCode.SESSION_NOT_VERIFIED,
                 message="Session not verified",
             )
 
-        new_access_token = await user_session.create_new_token(str(user_id))
+        if not await login_service.claim_token_issue(session_id):
+            raise APIError(
+                status_code=status.HTTP_404_NOT_FOUND,
+                error_code=ErrorCode.INVALID_SESSION,
+                message="Session already used",
+            )
+
+        tokens = await user_session.create_token_pair(login_session.user_id)
         await login_service.delete_session(session_id)
-        return APIResponse(
-            data={"access_token": new_access_token}, message="Session verified"
-        )
+        return APIResponse(data=tokens, message="Session verified")
+
+    @router.get("/login/session/wait")
+    @inject
+    async def wait_session(
+        self,
+        session_id: str = Query(...),
+        timeout: float = Query(30, gt=0, le=60, description="최대 대기 시간(초)"),
+        login_service: LoginSessionService = Depends(
+            Provide[ServiceContainer.login_session]
+        ),
+        user_session: UserSessionService = Depends(
+            Provide[ServiceContainer.user_session]
+        ),
+    ) -> APIResponse[dict]:
+        async with login_service.token_waiter(session_id) as waiter:
+            login_session = await login_service.get_session(session_id)
+            if not waiter.done():
+                if login_session is None:
+                    raise APIError(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        error_code=ErrorCode.INVALID_SESSION,
+                        message="Session not found",
+                    )
+                # 대기 전에 이미 인증된 세션, 선점하지 못했다면 다른 요청이 전달하는 토큰을 기다림
+                if login_session.user_id and await login_service.claim_token_issue(
+                    session_id
+                ):
+                    tokens = await user_session.create_token_pair(login_session.user_id)
+                    await login_service.delete_session(session_id)
+                    return APIResponse(data=tokens, message="Session verified")
+            try:
+                tokens = await asyncio.wait_for(waiter, timeout=timeout)
+            except asyncio.TimeoutError:
+                raise APIError(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    error_code=ErrorCode.SESSION_NOT_VERIFIED,
+                    message="Session not verified",
+                )
+        return APIResponse(data=tokens, message="Session verified")
 
     @router.post("/login/session")
     @limiter.limit("20/minute")
@@ -362,6 +407,32 @@ class AuthController:
             message="User information",
         )
 
+    @router.post("/token/refresh")
+    @limiter.limit("60/minute")
+    @inject
+    async def refresh_token(
+        self,
+        request: Request,
+        refresh_token: str = Body(..., embed=True),
+        user_session: UserSessionService = Depends(
+            Provide[ServiceContainer.user_session]
+        ),
+    ) -> APIResponse[dict]:
+        if not user_session.is_jwt_mode:
+            raise APIError(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                error_code=ErrorCode.INVALID_SESSION,
+                message="refresh token을 사용하지 않는 설정입니다.",
+            )
+        tokens = await user_session.refresh_access_token(refresh_token)
+        if tokens is None:
+            raise APIError(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                error_code=ErrorCode.INVALID_SESSION,
+                message="Invalid refresh token",
+            )
+        return APIResponse(data=tokens, message="Token refreshed")
+
     @router.post("/logout")
     @inject
     async def logout(
@@ -374,12 +445,47 @@ class AuthController:
         await user_session.delete_token(token)
         return APIResponse(message="Logout success")
 
+    @router.get("/sessions")
+    @inject
+    async def get_sessions(
+        self,
+        session: tuple[User, str] = Depends(get_current_session),
+        user_session: UserSessionService = Depends(
+            Provide[ServiceContainer.user_session]
+        ),
+    ) -> APIResponse[list[dict]]:
+        user, token = session
+        return APIResponse(
+            data=await user_session.list_sessions(str(user.id), token),
+            message="Active sessions",
+        )
+
+    @router.post("/sessions/revoke")
+    @limiter.limit("10/minute")
+    @inject
+    async def revoke_sessions(
+        self,
+        request: Request,
+        keep_current: bool = Body(False, embed=True),
+        session: tuple[User, str] = Depends(get_current_session),
+        user_session: UserSessionService = Depends(
+            Provide[ServiceContainer.user_session]
+        ),
+    ) -> APIResponse[dict]:
+        user, token = session
+        revoked = await user_session.revoke_all(
+            str(user.id), keep_token=token if keep_current else None
+        )
+        return APIResponse(data={"revoked": revoked}, message="Sessions revoked")
+
 
 @router.websocket("/subscribe")
 @inject
 async def wait_for_auth(
     websocket: WebSocket,
     session_id: str = Query(...),
+    # 2부터 앱 수준 ping 메시지를 보냄, 1은 인증 결과만 받는 기존 클라이언트
+    version: int = Query(1, ge=1, le=2),
     login_service: LoginSessionService = Depends(
         Provide[ServiceContainer.login_session]
     ),
@@ -390,10 +496,20 @@ async def wait_for_auth(
             code=status.WS_1003_UNSUPPORTED_DATA,
             reason="Session not found",
         )
+    if not await login_service.subscribe_session(
+        session_id, websocket, heartbeat=version >= 2
+    ):
+        return await websocket.close(
+            code=status.WS_1013_TRY_AGAIN_LATER,
+            reason="Too many connections",
+        )
     await websocket.send_json({"message": "Waiting for authentication"})
-    await login_service.subscribe_session(session_id, websocket)
     try:
         while True:
-            _ = await websocket.receive_bytes()
-    except WebSocketDisconnect:
-        await websocket.close()
+            # 클라이언트가 보내는 메시지는 ping 메시지에 대한 응답으로 처리
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            login_service.touch_subscriber(session_id, websocket)
+    finally:
+        await login_service.unsubscribe_session(session_id, websocket)
@@ -1,3 +1,5 @@
+from typing import Awaitable
+
 from dependency_injector.wiring import Provide, inject
 from fastapi import APIRouter, Request, Depends
 from fastapi_restful.cbv import cbv
@@ -6,10 +8,13 @@ from slowapi import Limiter
 from slowapi.util import get_remote_address
 from nacl.signing import VerifyKey
 from nacl.exceptions import BadSignatureError
-from discord import Interaction
+from discord import Embed
+from pydantic import ValidationError
+from sentry_sdk import capture_exception
 
 from app.core.string import get_main_domain
 from app.schema.discord import (
+    DiscordInteraction,
     InteractionResponse,
     InteractionCallbackType,
     InteractionType,
@@ -19,14 +24,18 @@ from app.logger import use_logger
 from app.core.redis import settings
 from app.service.cloudflare import CloudflareRequestService
 from app.service.container import ServiceContainer
+from app.core.response import APIError
 from app.service.discord_interaction import (
     DiscordRequester,
+    TicketControlDiscordComponent,
     TicketRespondDiscordComponent,
     check_discord_role,
 )
 from app.service.domain import DomainService
 from app.service.email import EmailRequesterService
+from app.entity import Domain as DomainEntity
 from app.entity import DomainTicket as DomainTicketEntity
+from app.entity import User as UserEntity
 from app.service.localdb import LocalDBService
 
 router = APIRouter(
@@ -40,10 +49,44 @@ limiter = Limiter(
 )
 _log = use_logger("discord-controller")
 
+# 로그는 DiscordLogSink에 넣기만 하고 나중에 보내므로 전송 여부는 알 수 없음
+_LOG_QUEUED = "전송 대기열에 추가됨"
+
 verify_key = VerifyKey(bytes.fromhex(settings.DISCORD_PUBLIC_KEY))
 
 
-async def verify_discord_signature(request: Request):
+async def _run_step(step: Awaitable, done: str = "완료") -> str:
+    try:
+        await step
+    except Exception as e:
+        capture_exception(e)
+        _log.error(f"Ticket step failed: {e}")
+        return "실패"
+    return done
+
+
+async def _rollback_approval(
+    domain_service: DomainService,
+    ticket: DomainTicketEntity,
+    domain: DomainEntity,
+    user: UserEntity | None,
+    results: dict[str, str],
+) -> bool:
+    try:
+        await domain_service.rollback_approved_ticket(ticket, domain, user)
+    except Exception as e:
+        capture_exception(e)
+        _log.error(f"Failed to roll back ticket {ticket.id}: {e}")
+        results["도메인"] = f"승인 되돌리기 실패 (도메인 ID=``{domain.id}``)"
+        return False
+    results["도메인"] = "승인 되돌림, 다시 승인하거나 거절할 수 있음"
+    return True
+
+
+async def verify_discord_signature(request: Request) -> bytes:
+    """
+    요청 본문을 디코딩하지 않고 그대로 서명을 검증한 뒤 본문을 반환합니다.
+    """
     signature = request.headers.get("X-Signature-Ed25519")
     timestamp = request.headers.get("X-Signature-Timestamp")
     body = await request.body()
@@ -52,11 +95,10 @@ async def verify_discord_signature(request: Request):
         raise HTTPException(status_code=401, detail="Invalid request signature")
 
     try:
-        verify_key.verify(
-            f"{timestamp}{body.decode()}".encode(), bytes.fromhex(signature)
-        )
-    except BadSignatureError:
+        verify_key.verify(timestamp.encode() + body, bytes.fromhex(signature))
+    except (BadSignatureError, ValueError):
         raise HTTPException(status_code=401, detail="Invalid request signature")
+    return body
 
 
 @cbv(router)
@@ -70,11 +112,11 @@ class DiscordController:
 
     async def process_interaction(
         self,
-        interaction: Interaction,
+        interaction: DiscordInteraction,
         task_manager: BackgroundTasks,
         requester: DiscordRequester,
     ) -> InteractionResponse | dict:
-        command_id, data = interaction.data["custom_id"].split("@")
+        command_id, data = interaction.data.command
         if not self.commands.get(command_id):
             return requester.response.send_message(
                 content="명령어를 찾을 수 없습니다.",
@@ -92,98 +134,167 @@ class DiscordController:
     @inject
     async def _approve_ticket(
         client: DiscordRequester,
-        ticket_id: str,
+        interaction: DiscordInteraction,
+        ticket_entity: DomainTicketEntity,
+        domain_entity: DomainEntity,
         email_service: EmailRequesterService = Depends(Provide[ServiceContainer.email]),
         cloudflare_service: CloudflareRequestService = Depends(
             Provide[ServiceContainer.cloudflare]
         ),
         domain_service: DomainService = Depends(Provide[ServiceContainer.domain]),
         localdb_service: LocalDBService = Depends(Provide[ServiceContainer.localdb]),
-    ) -> dict:
+    ) -> None:
+        # 단계별 처리 결과, 끝나면 원본 메시지에 표시
+        results: dict[str, str] = {}
+        succeeded = rolled_back = False
+        ticket_id = str(ticket_entity.id)
+        target_user = None
+        record_data: dict = {}
         try:
-            if not await DomainTicketEntity.exists(id=ticket_id):
-                return client.response.send_message(
-                    content="티켓을 찾을 수 없습니다.",
-                )
-            ticket_entity, domain_entity = await domain_service.approved_ticket(
-                ticket_id
-            )
             main_domain = get_main_domain(domain_entity.name)
             target_zone_id = await localdb_service.get_zone_id(main_domain)
             await ticket_entity.fetch_related("user")
-            target_user = await ticket_entity.user.all()
-            await target_user[0].domains.add(domain_entity)
-            record_created_data = await cloudflare_service.create_record(
-                zone_id=target_zone_id,
-                data={
-                    "name": ticket_entity.name,
-                    "content": ticket_entity.content,
-                    "type": ticket_entity.record_type,
-                    "ttl": int(ticket_entity.ttl),
-                    "proxied": ticket_entity.proxied,
-                },
-                entity_id=domain_entity.id,
-            )
-            record_zone_id = record_created_data["result"]["id"]
-            domain_entity.record_id = record_zone_id
-            await domain_entity.save()
-            if record_created_data["success"] is False:
-                await client.create_log_service_error(
-                    user=target_user[0],
-                    error_name="Cloudflare Record 생성 실패",
-                    description=f"Ticket ID: {ticket_id}",
-                    data=record_created_data,
+            target_user = (await ticket_entity.user.all())[0]
+            await target_user.domains.add(domain_entity)
+            record_data = {
+                "name": ticket_entity.name,
+                "content": ticket_entity.content,
+                "type": ticket_entity.record_type,
+                "ttl": int(ticket_entity.ttl),
+                "proxied": ticket_entity.proxied,
+            }
+            try:
+                record_created_data = await cloudflare_service.create_record(
+                    zone_id=target_zone_id,
+                    data=dict(record_data),
+                    entity_id=domain_entity.id,
                 )
-                await email_service.send_failed_email(
-                    to_email=target_user[0].email,
-                    domain_name=ticket_entity.name,
-                    reason="Cloudflare 오류, Ticket ID: " + ticket_id,
+            except APIError as e:
+                # Cloudflare가 레코드를 만들지 못했으므로 승인을 되돌리고 다시 시도할 수 있게 함
+                error = e.error_response
+                results["Cloudflare"] = f"레코드 생성 실패 ({error.message})"
+                rolled_back = await _rollback_approval(
+                    domain_service, ticket_entity, domain_entity, target_user, results
+                )
+                results["로그"] = await _run_step(
+                    client.create_log_service_error(
+                        user=target_user,
+                        error_name="Cloudflare Record 생성 실패",
+                        description=f"Ticket ID: {ticket_id}",
+                        data={**error.error_data, "trace_id": error.trace_id},
+                    ),
+                    done=_LOG_QUEUED,
+                )
+                results["이메일"] = await _run_step(
+                    email_service.send_failed_email(
+                        to_email=target_user.email,
+                        domain_name=ticket_entity.name,
+                        reason="Cloudflare 오류, Ticket ID: " + ticket_id,
+                    )
                 )
-            else:
-                await client.create_log_new_domain(
-                    user=target_user[0],
+                return
+            domain_entity.record_id = record_created_data["result"]["id"]
+            await domain_entity.save()
+            results["Cloudflare"] = f"레코드 생성됨 (``{domain_entity.record_id}``)"
+            succeeded = True
+            results["로그"] = await _run_step(
+                client.create_log_new_domain(
+                    user=target_user,
                     domain=domain_entity,
                     ticket=ticket_entity,
-                    data={
-                        "name": ticket_entity.name,
-                        "content": ticket_entity.content,
-                        "type": ticket_entity.record_type,
-                        "ttl": int(ticket_entity.ttl),
-                        "proxied": ticket_entity.proxied,
-                    },
-                )
-                await email_service.send_approved_email(
-                    to_email=target_user[0].email,
+                    data=record_data,
+                ),
+                done=_LOG_QUEUED,
+            )
+            results["이메일"] = await _run_step(
+                email_service.send_approved_email(
+                    to_email=target_user.email,
                     domain_name=ticket_entity.name,
                 )
+            )
         except Exception as e:
-            ticket_entity, domain_entity = await domain_service.approved_ticket(
-                ticket_id
+            capture_exception(e)
+            results["오류"] = str(e)[:500]
+            if succeeded:
+                return
+            if not domain_entity.record_id:
+                # 레코드 없이 만들어진 도메인은 남기지 않음
+                rolled_back = await _rollback_approval(
+                    domain_service, ticket_entity, domain_entity, target_user, results
+                )
+            if target_user is None:
+                await ticket_entity.fetch_related("user")
+                target_user = (await ticket_entity.user.all())[0]
+            if target_user is not None:
+                results["로그"] = await _run_step(
+                    client.create_log_service_error(
+                        user=target_user,
+                        error_name="도메인 생성 오류",
+                        description=f"Ticket ID: {ticket_id}",
+                        data={
+                            "traceback": str(e),
+                        },
+                    ),
+                    done=_LOG_QUEUED,
+                )
+                results["이메일"] = await _run_step(
+                    email_service.send_failed_email(
+                        to_email=target_user.email,
+                        domain_name=ticket_entity.name,
+                        reason="서비스 처리 도중 오류 발생, Ticket ID: " + ticket_id,
+                    )
+                )
+        finally:
+            await DiscordController._report_approval(
+                client, interaction, ticket_id, succeeded, rolled_back, results
             )
-            await ticket_entity.fetch_related("user")
-            target_user = await ticket_entity.user.all()
-            await client.create_log_service_error(
-                user=target_user[0],
-                error_name="도메인 생성 오류",
-                description=f"Ticket ID: {ticket_id}",
-                data={
-                    "traceback": str(e),
-                },
+
+    @staticmethod
+    async def _report_approval(
+        client: DiscordRequester,
+        interaction: DiscordInteraction,
+        ticket_id: str,
+        succeeded: bool,
+        rolled_back: bool,
+        results: dict[str, str],
+    ) -> None:
+        username = interaction.member.user.username
+        previous_embed = Embed.from_dict(interaction.message.embeds[0])
+        if succeeded:
+            previous_embed.title = "✅ " + previous_embed.title.replace(
+                "요청", "승인됨"
             )
+            content = f"승인되었습니다. (유저: {username})"
+            view = TicketRespondDiscordComponent.success(ticket_id)
+        else:
+            previous_embed.title = "⚠️ " + previous_embed.title.replace(
+                "요청", "승인 실패"
+            )
+            content = f"승인 처리에 실패했습니다. (유저: {username})"
+            # 승인을 되돌렸으면 다시 승인하거나 거절할 수 있게 하고, 아니면 버튼을 없앰
+            view = (
+                TicketControlDiscordComponent.retry(ticket_id) if rolled_back else None
+            )
+        content += "".join(f"\n- {step}: {result}" for step, result in results.items())
+        try:
+            await client.edit_original_response(
+                interaction.application_id,
+                interaction.token,
+                content=content[:2000],
+                embed=previous_embed,
+                view=view,
+            )
+        except Exception as e:
+            capture_exception(e)
+            _log.error(f"Failed to report ticket {ticket_id} approval: {e}")
 
     @staticmethod
     @inject
     async def _reject_ticket(
         client: DiscordRequester,
-        ticket_id: str,
+        ticket_entity: DomainTicketEntity,
         email_service: EmailRequesterService = Depends(Provide[ServiceContainer.email]),
-        domain_service: DomainService = Depends(Provide[ServiceContainer.domain]),
-    ) -> dict:
-        if not await DomainTicketEntity.exists(id=ticket_id):
-            return client.response.send_message(
-                content="티켓을 찾을 수 없습니다.",
-            )
-        ticket_entity = await domain_service.reject_ticket(ticket_id)
+    ) -> None:
         await ticket_entity.fetch_related("user")
         target_user = await ticket_entity.user.all()
         await client.create_log_rejected_domain(
@@ -202,36 +313,58 @@ class DiscordController:
             domain_name=ticket_entity.name,
         )
 
+    @staticmethod
+    def _already_processed(client: DiscordRequester, ticket_id: str) -> dict:
+        return client.response.send_message(
+            content=f"이미 처리된 티켓입니다. (Ticket ID: {ticket_id})",
+            ephemeral=True,
+        )
+
+    @inject
     async def approve_ticket(
         self,
-        interaction: Interaction,
+        interaction: DiscordInteraction,
         task_manager: BackgroundTasks,
         client: DiscordRequester,
         ticket_id: str,
+        domain_service: DomainService = Depends(Provide[ServiceContainer.domain]),
     ) -> dict:
-        previous_embed = interaction.message.embeds[0]
-        previous_embed.title = "✅ " + previous_embed.title.replace("요청", "승인됨")
-        component = TicketRespondDiscordComponent.success(ticket_id)
-        task_manager.add_task(self._approve_ticket, client, ticket_id)
+        if not await DomainTicketEntity.exists(id=ticket_id):
+            return client.response.send_message(
+                content="티켓을 찾을 수 없습니다.", ephemeral=True
+            )
+        approved = await domain_service.approved_ticket(ticket_id)
+        if approved is None:
+            return self._already_processed(client, ticket_id)
+        # Cloudflare 처리를 기다리지 않고 버튼부터 없애고, 결과는 처리 후 원본 메시지에 표시
+        task_manager.add_task(self._approve_ticket, client, interaction, *approved)
         return client.response.edit_message(
-            content=f"승인되었습니다. (유저: {interaction.user.name})",
-            embed=previous_embed,
-            view=component,
+            content=f"승인 처리 중입니다. (유저: {interaction.member.user.username})",
+            view=None,
         )
 
+    @inject
     async def reject_ticket(
         self,
-        interaction: Interaction,
+        interaction: DiscordInteraction,
         task_manager: BackgroundTasks,
         client: DiscordRequester,
         ticket_id: str,
+        domain_service: DomainService = Depends(Provide[ServiceContainer.domain]),
     ) -> dict:
-        previous_embed = interaction.message.embeds[0]
+        if not await DomainTicketEntity.exists(id=ticket_id):
+            return client.response.send_message(
+                content="티켓을 찾을 수 없습니다.", ephemeral=True
+            )
+        ticket_entity = await domain_service.reject_ticket(ticket_id)
+        if ticket_entity is None:
+            return self._already_processed(client, ticket_id)
+        previous_embed = Embed.from_dict(interaction.message.embeds[0])
         previous_embed.title = "❌ " + previous_embed.title.replace("요청", "거절됨")
         component = TicketRespondDiscordComponent.reject(ticket_id)
-        task_manager.add_task(self._reject_ticket, client, ticket_id)
+        task_manager.add_task(self._reject_ticket, client, ticket_entity)
         return client.response.edit_message(
-            content=f"거절했습니다. (유저: {interaction.user.name})",
+            content=f"거절했습니다. (유저: {interaction.member.user.username})",
             embed=previous_embed,
             view=component,
         )
@@ -246,39 +379,43 @@ class DiscordController:
             Provide[ServiceContainer.discord]
         ),
     ) -> dict:
-        await verify_discord_signature(request)
+        body = await verify_discord_signature(request)
 
-        interaction = await request.json()
+        try:
+            interaction = DiscordInteraction.model_validate_json(body)
+        except ValidationError:
+            raise HTTPException(status_code=400, detail="Invalid interaction")
 
-        if interaction["type"] == InteractionType.PING:
+        if interaction.type == InteractionType.PING:
             return InteractionResponse(
                 type=InteractionCallbackType.PONG, data={}
             ).model_dump()
 
-        elif interaction["type"] == InteractionType.MESSAGE_COMPONENT:
+        elif interaction.type == InteractionType.MESSAGE_COMPONENT:
+            if interaction.member is None or interaction.data is None:
+                return create_interaction_response(
+                    content="권한이 없습니다.",
+                    ephemeral=True,
+                )
             _log.debug(
-                f"New Interaction Data (User: {interaction['member']['user']['username']}): {interaction['data']}"
+                f"New Interaction Data (User: {interaction.member.user.username}): {interaction.data}"
             )
-            channel_id = interaction["channel_id"]
-            if channel_id != str(settings.DISCORD_VERIFY_CHANNEL_ID):
+            if interaction.channel_id != str(settings.DISCORD_VERIFY_CHANNEL_ID):
                 return create_interaction_response(
                     content="승인되지 않은 채널입니다.",
                     ephemeral=True,
                 )
 
             if not check_discord_role(
-                interaction["member"]["roles"], settings.DISCORD_VERIFY_ROLE_ID
+                interaction.member.roles, settings.DISCORD_VERIFY_ROLE_ID
             ):
                 return create_interaction_response(
                     content="권한이 없습니다.",
                     ephemeral=True,
                 )
 
-            interaction_context = await discord_requester.build_interaction_context(
-                interaction
-            )
             return await self.process_interaction(
-                interaction_context,
+                interaction,
                 task_manager=background_tasks,
                 requester=discord_requester,
             )
@@ -113,3 +113,43 @@ def create_modal(custom_id: str, title: str):
 class InteractionResponse(BaseModel):
     type: InteractionCallbackType
     data: dict[str, Any]
+
+
+class InteractionUser(BaseModel):
+    id: str
+    username: str
+
+
+class InteractionMember(BaseModel):
+    user: InteractionUser
+    roles: list[str] = []
+
+
+class InteractionData(BaseModel):
+    # 메시지 컴포넌트의 custom_id는 "{명령어}@{값}" 형식
+    custom_id: str = ""
+
+    @property
+    def command(self) -> tuple[str, str]:
+        command_id, _, value = self.custom_id.partition("@")
+        return command_id, value
+
+
+class InteractionMessage(BaseModel):
+    id: str
+    embeds: list[dict[str, Any]] = []
+
+
+class DiscordInteraction(BaseModel):
+    """
+    Discord interaction 요청 본문 중 라우팅과 응답에 필요한 값만 읽습니다.
+    """
+
+    id: str
+    type: int
+    application_id: str
+    token: str
+    channel_id: str | None = None
+    member: InteractionMember | None = None
+    data: InteractionData | None = None
+    message: InteractionMessage | None = None
@@ -0,0 +1,27 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class LoginSession(BaseModel):
+    """
+    Redis hash에 저장되는 로그인 세션입니다. 빈 값은 빈 문자열로 저장됩니다.
+    """
+
+    id: str
+    type: Literal["login", "application"] = "login"
+    user_id: str = ""
+    application_url: str = ""
+
+    def to_redis(self) -> dict[str, str]:
+        return self.model_dump(exclude={"id"})
+
+    @classmethod
+    def from_redis(cls, session_id: str, data: dict[bytes, bytes]) -> "LoginSession":
+        return cls(
+            id=session_id,
+            **{
+                key.decode("utf-8"): value.decode("utf-8")
+                for key, value in data.items()
+            },
+        )
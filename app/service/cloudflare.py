@@ -1,20 +1,25 @@
+import asyncio
 import contextlib
-from typing import ClassVar, Any
+from collections import deque
+from typing import AsyncIterator, ClassVar, Any
 
-from aiohttp import ClientSession
+from aiohttp import ClientError
 
+from app.core.circuit import guards
 from app.core.config import settings
 from app.core.error import ErrorCode
+from app.core.http import HTTPSessionManager
+from app.core.ratelimit import RedisTokenBucket, backoff_delay
 from app.core.response import APIError
+from app.core.singleflight import SingleFlight
 from app.logger import use_logger
+from app.service.record_index import ZoneRecordIndex
 
 from sentry_sdk import capture_exception
 
 _http_log = use_logger("aiohttp-request")
 _cf_log = use_logger("cloudflare-request-service")
 
-INTERNAL_API_VERSION: int = 4
-
 
 def content_type(response: Any) -> Any:
     if response.content_type == "text/html":
@@ -24,40 +29,188 @@ def content_type(response: Any) -> Any:
     return response.text()
 
 
+class DNSRecordBatch:
+    """
+    한 zone에 대한 레코드 생성/수정/삭제를 모아 Cloudflare batch API로 전송합니다.
+    CLOUDFLARE_BATCH_SIZE개씩 나눠서 보내며, 각 묶음은 Cloudflare에서 하나의
+    트랜잭션으로 처리됩니다.
+    """
+
+    OPERATIONS: ClassVar[tuple[str, ...]] = ("deletes", "patches", "posts")
+
+    def __init__(self, service: "CloudflareRequestService", zone_id: str) -> None:
+        self._service = service
+        self._zone_id = zone_id
+        self._items: list[tuple[str, str, dict]] = []
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def create(self, entity_id: str, data: dict) -> "DNSRecordBatch":
+        data = {**data, "comment": f"Domain ID: {entity_id}"}
+        self._items.append(("posts", str(entity_id), data))
+        return self
+
+    def update(self, entity_id: str, record_id: str, data: dict) -> "DNSRecordBatch":
+        self._items.append(("patches", str(entity_id), {**data, "id": record_id}))
+        return self
+
+    def delete(self, entity_id: str, record_id: str) -> "DNSRecordBatch":
+        self._items.append(("deletes", str(entity_id), {"id": record_id}))
+        return self
+
+    async def submit(self) -> list[dict]:
+        """
+        추가한 순서대로 처리 결과를 반환합니다.
+        {"action": "posts", "entity_id": "...", "success": True, "result": {...}} 형태이며,
+        실패한 묶음의 항목은 success가 False입니다.
+        """
+        items, self._items = self._items, []
+        results = [
+            {"action": operation, "entity_id": entity_id, "success": False}
+            for operation, entity_id, _payload in items
+        ]
+        for offset in range(0, len(items), settings.CLOUDFLARE_BATCH_SIZE):
+            chunk = range(
+                offset, min(offset + settings.CLOUDFLARE_BATCH_SIZE, len(items))
+            )
+            body = {operation: [] for operation in self.OPERATIONS}
+            # 응답은 operation별로 요청한 순서대로 오므로 각 항목의 위치를 기록
+            positions = {operation: [] for operation in self.OPERATIONS}
+            for index in chunk:
+                operation, _entity_id, payload = items[index]
+                body[operation].append(payload)
+                positions[operation].append(index)
+
+            try:
+                response = await self._service.request(
+                    "POST",
+                    f"/zones/{self._zone_id}/dns_records/batch",
+                    json={key: value for key, value in body.items() if value},
+                )
+            except APIError as e:
+                for index in chunk:
+                    results[index]["error"] = e.error_response.message
+                continue
+
+            for operation in self.OPERATIONS:
+                records = (response.get("result") or {}).get(operation) or []
+                for index, payload, record in zip(
+                    positions[operation], body[operation], records
+                ):
+                    if operation == "deletes":
+                        await self._service.record_index.remove(
+                            self._zone_id, payload["id"]
+                        )
+                    else:
+                        await self._service.record_index.put(self._zone_id, record)
+                    results[index].update(success=True, result=record)
+        return results
+
+
 class CloudflareRequestService:
-    API: ClassVar[str] = f"https://api.cloudflare.com/client/v{INTERNAL_API_VERSION}"
+    API: ClassVar[str] = settings.CLOUDFLARE_API_URL
 
-    def __init__(self) -> None:
-        self._session = ClientSession(
+    RETRY_STATUS: ClassVar[frozenset[int]] = frozenset({429, 500, 502, 503, 504})
+    IDEMPOTENT_METHODS: ClassVar[frozenset[str]] = frozenset(
+        {"GET", "PUT", "PATCH", "DELETE"}
+    )
+
+    def __init__(
+        self,
+        http: HTTPSessionManager,
+        record_index: ZoneRecordIndex,
+        rate_limiter: RedisTokenBucket,
+        singleflight: SingleFlight,
+    ) -> None:
+        self.record_index = record_index
+        self._rate_limiter = rate_limiter
+        self._singleflight = singleflight
+        self._guard = guards.get("cloudflare")
+        self._session = http.session(
+            "cloudflare",
             headers={
                 "Authorization": f"Bearer {settings.CLOUDFLARE_API_TOKEN}",
-            }
+            },
+        )
+
+    @staticmethod
+    def _server_error() -> APIError:
+        return APIError(
+            status_code=400,
+            error_code=ErrorCode.DNS_SERVER_ERROR,
+            message="DNS 서버에서 요청을 처리할 수 없습니다. 잠시 후 다시 시도해주세요.",
         )
 
+    def _retryable(self, method: str, status: int | None, attempt: int) -> bool:
+        if attempt >= settings.CLOUDFLARE_MAX_RETRIES:
+            return False
+        # 429는 처리되지 않은 요청이므로 항상 재시도, 나머지는 멱등 요청만 재시도
+        if status == 429:
+            return True
+        return method.upper() in self.IDEMPOTENT_METHODS
+
     async def request(self, method: str, path: str, **kwargs):
+        if method.upper() != "GET":
+            return await self._request(method, path, **kwargs)
+        # 동시에 들어온 같은 GET 요청은 한 번만 보내고 결과를 공유
+        params = kwargs.get("params") or {}
+        key = (path, tuple(sorted(params.items())))
+        return await self._singleflight.do(
+            key, lambda: self._request(method, path, **kwargs)
+        )
+
+    async def _request(self, method: str, path: str, **kwargs):
         url = f"{self.API}{path}"
-        async with self._session.request(method, url, **kwargs) as response:
-            _http_log.debug(
-                "%s %s with %s has returned %s",
-                method,
-                url,
-                kwargs.get("data"),
-                response.status,
-            )
-            data = await content_type(response)
+        attempt = 0
+        while True:
+            if not await self._rate_limiter.acquire():
+                error = self._server_error()
+                capture_exception(error)
+                _cf_log.info(f"Rate limit wait exceeded: {method} {url}")
+                raise error
 
-            if 300 > response.status >= 200:
-                _http_log.debug("%s %s has received %s", method, url, data)
-                return data
+            retry_after = None
+            try:
+                async with (
+                    self._guard.call() as call,
+                    self._session.request(method, url, **kwargs) as response,
+                ):
+                    if response.status >= 500:
+                        call.fail()
+                    _http_log.debug(
+                        "%s %s with %s has returned %s",
+                        method,
+                        url,
+                        kwargs.get("data"),
+                        response.status,
+                    )
+                    data = await content_type(response)
 
-            error = APIError(
-                status_code=400,
-                error_code=ErrorCode.DNS_SERVER_ERROR,
-                message="DNS 서버에서 요청을 처리할 수 없습니다. 잠시 후 다시 시도해주세요.",
-            )
-            capture_exception(error)
-            _cf_log.info(f"Error: {data}")
-            raise error
+                    if 300 > response.status >= 200:
+                        _http_log.debug("%s %s has received %s", method, url, data)
+                        return data
+
+                    if not (
+                        response.status in self.RETRY_STATUS
+                        and self._retryable(method, response.status, attempt)
+                    ):
+                        error = self._server_error()
+                        capture_exception(error)
+                        _cf_log.info(f"Error: {data}")
+                        raise error
+                    retry_after = response.headers.get("Retry-After")
+            except (ClientError, asyncio.TimeoutError) as e:
+                if not self._retryable(method, None, attempt):
+                    error = self._server_error()
+                    capture_exception(e)
+                    _cf_log.info(f"Error: {e}")
+                    raise error from e
+
+            delay = backoff_delay(attempt, retry_after)
+            _cf_log.info(f"Retrying {method} {url} in {delay:.2f}s ({attempt + 1})")
+            await asyncio.sleep(delay)
+            attempt += 1
 
     async def available_zones(self):
         data = await self.request("GET", "/zones")
@@ -74,16 +227,76 @@ class CloudflareRequestService:
     async def fetch_zones(self):
         return await self.request("GET", "/zones")
 
-    async def fetch_record(self, zone_id: str):
-        return await self.request("GET", f"/zones/{zone_id}/dns_records")
+    async def fetch_record(
+        self, zone_id: str, page: int = 1, per_page: int | None = None, **params
+    ):
+        params.update(
+            {
+                "page": page,
+                "per_page": per_page or settings.CLOUDFLARE_RECORD_PAGE_SIZE,
+            }
+        )
+        return await self.request("GET", f"/zones/{zone_id}/dns_records", params=params)
+
+    async def iter_records(
+        self, zone_id: str, per_page: int | None = None, **params
+    ) -> AsyncIterator[list[dict]]:
+        """
+        zone의 DNS 레코드를 페이지 단위로 반환합니다.
+        첫 페이지 이후는 CLOUDFLARE_RECORD_PAGE_CONCURRENCY개씩 동시에 요청하며,
+        중간에 반복을 멈추면 아직 받지 않은 페이지 요청은 취소됩니다.
+        """
+        first_page = await self.fetch_record(zone_id, 1, per_page, **params)
+        yield first_page["result"]
+
+        total_pages = first_page.get("result_info", {}).get("total_pages", 1)
+        pending: deque[asyncio.Task] = deque()
+        next_page = 2
+        try:
+            while next_page <= total_pages or pending:
+                while (
+                    next_page <= total_pages
+                    and len(pending) < settings.CLOUDFLARE_RECORD_PAGE_CONCURRENCY
+                ):
+                    pending.append(
+                        asyncio.create_task(
+                            self.fetch_record(zone_id, next_page, per_page, **params)
+                        )
+                    )
+                    next_page += 1
+                page = await pending.popleft()
+                yield page["result"]
+        finally:
+            for task in pending:
+                task.cancel()
+            # 취소된 요청이 응답을 정리할 때까지 기다리고 예외는 버림
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def fetch_all_records(self, zone_id: str) -> list[dict]:
+        records = []
+        async for page in self.iter_records(zone_id):
+            records.extend(page)
+        return records
+
+    async def find_record(self, zone_id: str, name: str) -> dict | None:
+        async with contextlib.aclosing(self.iter_records(zone_id)) as pages:
+            async for page in pages:
+                for record in page:
+                    if record["name"].lower() == name.lower():
+                        return record
+        return None
 
     async def is_available_domain(
         self,
         domain: str,
         zone_id: str,
     ) -> bool:
-        records = await self.fetch_record(zone_id)
-        return domain not in [record["name"] for record in records["result"]]
+        exists = await self.record_index.contains(zone_id, domain)
+        if exists is None:
+            records = await self.fetch_all_records(zone_id)
+            await self.record_index.replace(zone_id, records)
+            exists = await self.record_index.contains(zone_id, domain)
+        return not exists
 
     async def create_record(
         self,
@@ -96,12 +309,25 @@ class CloudflareRequestService:
                 "comment": f"Domain ID: {entity_id}",
             }
         )
-        return await self.request("POST", f"/zones/{zone_id}/dns_records", json=data)
+        created = await self.request("POST", f"/zones/{zone_id}/dns_records", json=data)
+        if created.get("success"):
+            await self.record_index.put(zone_id, created["result"])
+        return created
 
     async def update_record(self, zone_id: str, record_id: str, data: dict) -> dict:
-        return await self.request(
+        updated = await self.request(
             "PATCH", f"/zones/{zone_id}/dns_records/{record_id}", json=data
         )
+        if updated.get("success"):
+            await self.record_index.put(zone_id, updated["result"])
+        return updated
 
     async def delete_record(self, zone_id: str, record_id: str) -> dict:
-        return await self.request("DELETE", f"/zones/{zone_id}/dns_records/{record_id}")
+        deleted = await self.request(
+            "DELETE", f"/zones/{zone_id}/dns_records/{record_id}"
+        )
+        await self.record_index.remove(zone_id, record_id)
+        return deleted
+
+    def batch(self, zone_id: str) -> DNSRecordBatch:
+        return DNSRecordBatch(self, zone_id)
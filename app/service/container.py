@@ -1,5 +1,10 @@
 from dependency_injector import containers, providers
 
+from app.core.config import settings
+from app.core.http import HTTPSessionManager
+from app.core.pubsub import RedisPubSubHub
+from app.core.ratelimit import RedisTokenBucket
+from app.core.singleflight import SingleFlight
 from app.core.websocket import ConnectionManager
 from app.service.cloudflare import CloudflareRequestService
 from app.service.discord_interaction import DiscordRequester
@@ -7,22 +12,69 @@ from app.service.domain import DomainService
 from app.service.email import EmailRequesterService
 from app.service.google import GoogleRequestService
 from app.service.localdb import LocalDBService
+from app.service.login_events import LoginEventService
+from app.service.reconcile import DNSReconciliationService
+from app.service.record_index import ZoneRecordIndex
 from app.service.session import LoginSessionService, UserSessionService
+from app.service.token_revocation import TokenRevocationService
 from app.service.transfer import DomainTransferService
+from app.service.user_cache import UserCacheService
 from app.service.vercel import VercelRequestService
 
 
 class ServiceContainer(containers.DeclarativeContainer):
-    google: GoogleRequestService = providers.Factory(GoogleRequestService)
-    websocket = providers.Singleton(ConnectionManager)
+    http: HTTPSessionManager = providers.Singleton(HTTPSessionManager)
+    pubsub: RedisPubSubHub = providers.Singleton(RedisPubSubHub)
+    google: GoogleRequestService = providers.Singleton(GoogleRequestService)
+    websocket: ConnectionManager = providers.Singleton(
+        ConnectionManager,
+        max_connections=settings.LOGIN_WEBSOCKET_MAX_CONNECTIONS,
+        ping_interval=settings.LOGIN_WEBSOCKET_PING_INTERVAL,
+        idle_timeout=settings.LOGIN_WEBSOCKET_IDLE_TIMEOUT,
+    )
     login_session: LoginSessionService = providers.Singleton(
-        LoginSessionService, websocket=websocket
+        LoginSessionService, websocket=websocket, pubsub=pubsub
+    )
+    token_revocation: TokenRevocationService = providers.Singleton(
+        TokenRevocationService, pubsub=pubsub
+    )
+    user_session: UserSessionService = providers.Factory(
+        UserSessionService, revocation=token_revocation
+    )
+    user_cache: UserCacheService = providers.Singleton(
+        UserCacheService,
+        pubsub=pubsub,
+        max_size=settings.USER_CACHE_SIZE,
+        ttl=settings.USER_CACHE_TTL,
+    )
+    record_index: ZoneRecordIndex = providers.Singleton(ZoneRecordIndex, pubsub=pubsub)
+    cloudflare_rate_limiter: RedisTokenBucket = providers.Singleton(
+        RedisTokenBucket,
+        key="CLOUDFLARE_RATE_LIMIT",
+        rate=(settings.CLOUDFLARE_RATE_LIMIT - settings.CLOUDFLARE_RATE_BURST)
+        / settings.CLOUDFLARE_RATE_PERIOD,
+        burst=settings.CLOUDFLARE_RATE_BURST,
+        max_wait=settings.CLOUDFLARE_RATE_MAX_WAIT,
+    )
+    cloudflare_singleflight: SingleFlight = providers.Singleton(
+        SingleFlight, reuse_seconds=settings.CLOUDFLARE_READ_REUSE_SECONDS
+    )
+    cloudflare: CloudflareRequestService = providers.Factory(
+        CloudflareRequestService,
+        http=http,
+        record_index=record_index,
+        rate_limiter=cloudflare_rate_limiter,
+        singleflight=cloudflare_singleflight,
     )
-    user_session: UserSessionService = providers.Factory(UserSessionService)
-    cloudflare: CloudflareRequestService = providers.Factory(CloudflareRequestService)
     localdb: LocalDBService = providers.Singleton(LocalDBService)
+    reconcile: DNSReconciliationService = providers.Singleton(
+        DNSReconciliationService, cloudflare=cloudflare, localdb=localdb
+    )
     domain: DomainService = providers.Singleton(DomainService)
-    discord: DiscordRequester = providers.Factory(DiscordRequester)
-    email: EmailRequesterService = providers.Factory(EmailRequesterService)
+    discord: DiscordRequester = providers.Singleton(DiscordRequester, http=http)
+    email: EmailRequesterService = providers.Factory(EmailRequesterService, http=http)
     transfer: DomainTransferService = providers.Factory(DomainTransferService)
-    vercel: VercelRequestService = providers.Factory(VercelRequestService)
+    vercel: VercelRequestService = providers.Factory(VercelRequestService, http=http)
+    login_events: LoginEventService = providers.Singleton(
+        LoginEventService, discord=discord, email=email
+    )
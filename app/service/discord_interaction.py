@@ -1,15 +1,13 @@
 from typing import Any, Sequence, Union
 
 from discord.abc import MISSING
+from discord.http import Route, handle_message_parameters
 from discord.ui import View
 from discord.webhook.async_ import interaction_message_response_params
 from discord import (
     Embed,
     ui,
     ButtonStyle,
-    Interaction,
-    Client,
-    Intents,
     Color,
     File,
     AllowedMentions,
@@ -21,7 +19,10 @@ from discord import (
 from datetime import datetime
 
 from app.core.config import settings
+from app.core.http import HTTPSessionManager
 from app.logger import use_logger
+from app.service.discord_log import DiscordLogSink
+from app.service.discord_sender import DiscordSender, SendPriority
 
 from app.entity import User as UserEntity
 from app.entity import Domain as DomainEntity
@@ -30,6 +31,9 @@ from app.entity import DomainTicket as DomainTicketEntity
 _http_log = use_logger("aiohttp-request")
 _discord_log = use_logger("discord-request-service")
 
+# discord.py는 API 주소를 Route에 고정하므로 설정 값으로 교체
+Route.BASE = settings.DISCORD_API_URL
+
 
 def check_discord_role(roles: list[str], specific_role_id: int) -> bool:
     return any(role_id == str(specific_role_id) for role_id in roles)
@@ -63,10 +67,10 @@ class TicketRespondDiscordComponent(ui.View):
 
 
 class TicketControlDiscordComponent(ui.View):
-    def __init__(self, ticket_id: str):
+    def __init__(self, ticket_id: str, approve_label: str = "승인"):
         super().__init__(timeout=None)
         approve_button = ui.Button(
-            label="승인",
+            label=approve_label,
             style=ButtonStyle.green,
             custom_id=f"approve@{ticket_id}",
         )
@@ -82,6 +86,10 @@ class TicketControlDiscordComponent(ui.View):
             reject_button,
         )
 
+    @classmethod
+    def retry(cls, ticket_id: str) -> "TicketControlDiscordComponent":
+        return cls(ticket_id, approve_label="다시 승인")
+
 
 def build_ticket_message(
     domain_name: str, user: UserEntity, record_value: dict, ticket_id: str
@@ -164,35 +172,75 @@ class InteractionRestResponse:
 
 
 class DiscordRequester:
-    def __init__(self) -> None:
-        self._client = Client(
-            intents=Intents.none(),
+    """
+    프로세스 전체에서 하나의 Discord REST client를 사용합니다.
+    채널 메시지는 채널 조회 없이 DiscordSender로 rate limit bucket에 맞춰 보내며,
+    티켓 메시지는 감사 로그보다 먼저 보냅니다.
+    interaction 응답과 REST 요청 모두 bot 로그인(gateway 세션)이 필요하지 않습니다.
+    """
+
+    def __init__(self, http: HTTPSessionManager) -> None:
+        self.sender = DiscordSender(http)
+        self.log_sink = DiscordLogSink(
+            self._send_log,
+            max_size=settings.DISCORD_LOG_BUFFER_SIZE,
+            flush_interval=settings.DISCORD_LOG_FLUSH_INTERVAL,
+            overflow=settings.DISCORD_LOG_OVERFLOW,
+            block_timeout=settings.DISCORD_LOG_BLOCK_TIMEOUT,
         )
-        self._is_login = False
 
     @property
     def response(self) -> InteractionRestResponse:
         return InteractionRestResponse()
 
-    async def login(self) -> None:
-        await self._client.login(settings.DISCORD_BOT_TOKEN)
-        self._is_login = True
+    async def _send(
+        self, channel_id: str, priority: SendPriority = SendPriority.LOG, **kwargs
+    ) -> None:
+        params = handle_message_parameters(**kwargs)
+        await self.sender.request(
+            "POST",
+            f"/channels/{channel_id}/messages",
+            params.payload,
+            priority=priority,
+        )
+
+    async def edit_original_response(
+        self, application_id: str, token: str, **kwargs
+    ) -> None:
+        # 지연 응답(deferred)한 interaction의 원본 메시지를 수정
+        params = handle_message_parameters(**kwargs)
+        await self.sender.request(
+            "PATCH",
+            f"/webhooks/{application_id}/{token}/messages/@original",
+            params.payload,
+            priority=SendPriority.TICKET,
+        )
+
+    async def _send_log(self, **kwargs) -> None:
+        await self._send(settings.DISCORD_LOG_CHANNEL_ID, **kwargs)
+
+    async def _log(self, content: str, embed: Embed) -> None:
+        # lifespan 밖에서 사용하면 모으지 않고 바로 전송
+        if self.log_sink.running:
+            await self.log_sink.put(content, embed)
+        else:
+            await self._send_log(content=content, embed=embed)
 
-    async def _login_check(self) -> None:
-        if not self._is_login:
-            await self.login()
+    async def start(self) -> None:
+        self.sender.start()
+        self.log_sink.start()
+
+    async def stop(self) -> None:
+        await self.log_sink.stop()
+        await self.sender.stop()
 
     async def send_ticket_message(
         self, domain_name: str, user: UserEntity, record_value: dict, ticket_id: str
     ) -> None:
-        await self._login_check()
         message = build_ticket_message(domain_name, user, record_value, ticket_id)
-        channel = await self._client.fetch_channel(settings.DISCORD_VERIFY_CHANNEL_ID)
-        await channel.send(**message)
-
-    async def build_interaction_context(self, data: dict) -> Interaction:
-        await self._login_check()
-        return Interaction(data=data, state=getattr(self._client, "_connection"))
+        await self._send(
+            settings.DISCORD_VERIFY_CHANNEL_ID, priority=SendPriority.TICKET, **message
+        )
 
     async def create_log_new_domain(
         self,
@@ -201,8 +249,6 @@ class DiscordRequester:
         domain: DomainEntity,
         data: dict,
     ) -> None:
-        await self._login_check()
-        channel = await self._client.fetch_channel(settings.DISCORD_LOG_CHANNEL_ID)
         value_string = "\n".join(f"{key}: {value}" for key, value in data.items())
         embed = Embed(
             title=f"[새 도메인 등록] {domain.name}",
@@ -210,7 +256,7 @@ class DiscordRequester:
             color=Color.from_str("#00FF00"),
         ).set_author(name=f"{user.nickname} ({user.email})", icon_url=user.avatar)
         embed.timestamp = datetime.now()
-        await channel.send(
+        await self._log(
             content=f"[새 도메인 등록] 도메인 ID=``{domain.id}``\n"
             f"티켓 ID=``{ticket.id}``",
             embed=embed,
@@ -222,8 +268,6 @@ class DiscordRequester:
         ticket: DomainTicketEntity,
         data: dict,
     ) -> None:
-        await self._login_check()
-        channel = await self._client.fetch_channel(settings.DISCORD_LOG_CHANNEL_ID)
         value_string = "\n".join(f"{key}: {value}" for key, value in data.items())
         embed = Embed(
             title=f"[도메인 거절] {ticket.name}",
@@ -231,7 +275,7 @@ class DiscordRequester:
             color=Color.from_str("#FF0000"),
         ).set_author(name=f"{user.nickname} ({user.email})", icon_url=user.avatar)
         embed.timestamp = datetime.now()
-        await channel.send(
+        await self._log(
             content=f"[도메인 거절] 티켓 ID=``{ticket.id}``",
             embed=embed,
         )
@@ -243,15 +287,13 @@ class DiscordRequester:
         description: str,
         data: dict,
     ) -> None:
-        await self._login_check()
-        channel = await self._client.fetch_channel(settings.DISCORD_LOG_CHANNEL_ID)
         embed = Embed(
             title=f"[서비스 에러] {error_name}",
             description=f"{description}\n```json\n{data}\n```",
             color=Color.from_str("#FF0000"),
         ).set_author(name=f"{user.nickname} ({user.email})", icon_url=user.avatar)
         embed.timestamp = datetime.now()
-        await channel.send(
+        await self._log(
             content=f"[서비스 에러] {error_name}",
             embed=embed,
         )
@@ -262,8 +304,6 @@ class DiscordRequester:
         domain: DomainEntity,
         data: dict,
     ) -> None:
-        await self._login_check()
-        channel = await self._client.fetch_channel(settings.DISCORD_LOG_CHANNEL_ID)
         value_string = "\n".join(f"{key}: {value}" for key, value in data.items())
         embed = Embed(
             title=f"[도메인 업데이트] {domain.name}",
@@ -271,7 +311,7 @@ class DiscordRequester:
             color=Color.from_str("#00FF00"),
         ).set_author(name=f"{user.nickname} ({user.email})", icon_url=user.avatar)
         embed.timestamp = datetime.now()
-        await channel.send(
+        await self._log(
             content=f"[도메인 업데이트] 도메인 ID=``{domain.id}``\n"
             f"도메인 Cloudflare Record ID = ``{domain.record_id}``",
             embed=embed,
@@ -282,43 +322,37 @@ class DiscordRequester:
         user: UserEntity,
         ticket: DomainTicketEntity,
     ) -> None:
-        await self._login_check()
-        channel = await self._client.fetch_channel(settings.DISCORD_LOG_CHANNEL_ID)
         embed = Embed(
             title=f"[티켓 종료] {ticket.name}",
             description=f"사용자가 티켓을 종료함.",
             color=Color.from_str("#00FF00"),
         ).set_author(name=f"{user.nickname} ({user.email})", icon_url=user.avatar)
         embed.timestamp = datetime.now()
-        await channel.send(
+        await self._log(
             content=f"[티켓 종료] 티켓 ID=``{ticket.id}``",
             embed=embed,
         )
 
     async def create_log_user_create(self, email: str, name: str, avatar: str) -> None:
-        await self._login_check()
-        channel = await self._client.fetch_channel(settings.DISCORD_LOG_CHANNEL_ID)
         embed = Embed(
             title=f"[유저 생성] {name}",
             description=f"사용자가 생성됨.",
             color=Color.from_str("#00FF00"),
         ).set_author(name=f"{name} ({email})", icon_url=avatar)
         embed.timestamp = datetime.now()
-        await channel.send(
+        await self._log(
             content=f"[유저 생성] {name}",
             embed=embed,
         )
 
     async def create_log_refresh_session(self, user: UserEntity) -> None:
-        await self._login_check()
-        channel = await self._client.fetch_channel(settings.DISCORD_LOG_CHANNEL_ID)
         embed = Embed(
             title=f"[세션 갱신] {user.nickname}",
             description=f"세션 갱신됨.\n",
             color=Color.from_str("#00FF00"),
         ).set_author(name=f"{user.nickname} ({user.email})", icon_url=user.avatar)
         embed.timestamp = datetime.now()
-        await channel.send(
+        await self._log(
             content=f"[세션 갱신] {user.nickname}",
             embed=embed,
         )
@@ -326,15 +360,13 @@ class DiscordRequester:
     async def create_log_delete_domain(
         self, user: UserEntity, domain: DomainEntity
     ) -> None:
-        await self._login_check()
-        channel = await self._client.fetch_channel(settings.DISCORD_LOG_CHANNEL_ID)
         embed = Embed(
             title=f"[도메인 삭제] {domain.name}",
             description=f"도메인 삭제됨. {domain.name}이 삭제됨.",
             color=Color.from_str("#FF0000"),
         ).set_author(name=f"{user.nickname} ({user.email})", icon_url=user.avatar)
         embed.timestamp = datetime.now()
-        await channel.send(
+        await self._log(
             content=f"[도메인 삭제]",
             embed=embed,
         )
@@ -342,15 +374,13 @@ class DiscordRequester:
     async def create_log_transfer_invite(
         self, user: UserEntity, domain: DomainEntity, target_user_email: str
     ) -> None:
-        await self._login_check()
-        channel = await self._client.fetch_channel(settings.DISCORD_LOG_CHANNEL_ID)
         embed = Embed(
             title=f"[도메인 이전 링크 생성] {domain.name}",
             description=f" {domain.name} 도메인을 {target_user_email}에게 이전할 수 있는 링크 생성됨.",
             color=Color.from_str("#FF0000"),
         ).set_author(name=f"{user.nickname} ({user.email})", icon_url=user.avatar)
         embed.timestamp = datetime.now()
-        await channel.send(
+        await self._log(
             content=f"[도메인 이전 링크 생성]",
             embed=embed,
         )
@@ -358,15 +388,13 @@ class DiscordRequester:
     async def create_log_transfer_domain(
         self, user: UserEntity, domain: DomainEntity, target_user_email: str
     ) -> None:
-        await self._login_check()
-        channel = await self._client.fetch_channel(settings.DISCORD_LOG_CHANNEL_ID)
         embed = Embed(
             title=f"[도메인 이전] {domain.name}",
             description=f"도메인 이전됨. {domain.name}이 {target_user_email}로 이전됨.",
             color=Color.from_str("#FF0000"),
         ).set_author(name=f"{user.nickname} ({user.email})", icon_url=user.avatar)
         embed.timestamp = datetime.now()
-        await channel.send(
+        await self._log(
             content=f"[도메인 이전]",
             embed=embed,
         )
@@ -0,0 +1,215 @@
+import asyncio
+import contextlib
+import json
+from collections import deque
+from typing import Awaitable, Callable, Literal
+
+import redis.exceptions
+from discord import Embed, HTTPException
+from sentry_sdk import capture_exception
+
+from app.core.redis import manager
+from app.logger import use_logger
+
+_sink_log = use_logger("discord-log-sink")
+
+OverflowPolicy = Literal["block", "spill", "drop"]
+
+
+class DiscordLogSink:
+    """
+    Discord 로그를 버퍼에 모았다가 embed 여러 개를 담은 메시지 하나로 보냅니다.
+    embed가 한 메시지 분량만큼 모이거나 flush_interval이 지나면 전송합니다.
+    버퍼가 가득 차면 overflow 정책에 따라 자리가 날 때까지 기다리거나(block, 시간 초과 시 spill),
+    Redis 목록에 임시로 옮기거나(spill), 버립니다(drop). 옮긴 로그는 버퍼에 자리가 나면 다시 보냅니다.
+    """
+
+    SPILL_KEY = "DISCORD_LOG_SPILL"
+    # Discord 메시지 하나의 제한
+    MAX_EMBEDS = 10
+    MAX_EMBED_CHARS = 6000
+    MAX_CONTENT = 2000
+    RETRY_DELAY = 5
+
+    def __init__(
+        self,
+        send: Callable[..., Awaitable[None]],
+        max_size: int,
+        flush_interval: float,
+        overflow: OverflowPolicy,
+        block_timeout: float,
+    ) -> None:
+        self.redis = manager.get_connection()
+        self._send = send
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self._buffer: deque[dict] = deque()
+        self._wakeup = asyncio.Event()
+        self._not_full = asyncio.Event()
+        # 이전 프로세스가 옮겨 둔 로그가 있을 수 있음
+        self._has_spilled = True
+        self._task: asyncio.Task | None = None
+        self.counters = {
+            "messages": 0,
+            "entries": 0,
+            "failed": 0,
+            "spilled": 0,
+            "dropped": 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def put(self, content: str, embed: Embed) -> None:
+        entry = {"content": content, "embed": embed.to_dict()}
+        if len(self._buffer) >= self.max_size:
+            if self.overflow == "drop":
+                self.counters["dropped"] += 1
+                _sink_log.warning(f"Log buffer is full, dropped: {content}")
+                return
+            if self.overflow == "spill" or not await self._wait_for_space():
+                await self._spill(entry)
+                return
+        self._buffer.append(entry)
+        if len(self._buffer) == 1 or len(self._buffer) >= self.MAX_EMBEDS:
+            self._wakeup.set()
+
+    async def _wait_for_space(self) -> bool:
+        try:
+            async with asyncio.timeout(self.block_timeout):
+                while len(self._buffer) >= self.max_size:
+                    self._not_full.clear()
+                    await self._not_full.wait()
+        except TimeoutError:
+            return False
+        return True
+
+    async def _spill(self, entry: dict) -> None:
+        try:
+            await self.redis.rpush(self.SPILL_KEY, json.dumps(entry))
+        except redis.exceptions.RedisError as e:
+            self.counters["dropped"] += 1
+            capture_exception(e)
+            _sink_log.error(f"Log spill failed, dropped: {entry['content']}")
+            return
+        self._has_spilled = True
+        self.counters["spilled"] += 1
+
+    async def _refill(self) -> None:
+        room = self.max_size - len(self._buffer)
+        if not self._has_spilled or room <= 0:
+            return
+        entries = await self.redis.lpop(self.SPILL_KEY, min(room, 100))
+        if not entries:
+            self._has_spilled = False
+            return
+        self._buffer.extend(json.loads(entry) for entry in entries)
+
+    def _take_batch(self) -> list[dict]:
+        batch = []
+        embed_chars = content_chars = 0
+        while self._buffer and len(batch) < self.MAX_EMBEDS:
+            entry = self._buffer[0]
+            entry_embed_chars = len(Embed.from_dict(entry["embed"]))
+            entry_content_chars = len(entry["content"]) + 1
+            if batch and (
+                embed_chars + entry_embed_chars > self.MAX_EMBED_CHARS
+                or content_chars + entry_content_chars > self.MAX_CONTENT
+            ):
+                break
+            batch.append(self._buffer.popleft())
+            embed_chars += entry_embed_chars
+            content_chars += entry_content_chars
+        self._not_full.set()
+        return batch
+
+    async def _send_batch(self, batch: list[dict]) -> None:
+        await self._send(
+            content="\n".join(entry["content"] for entry in batch)[: self.MAX_CONTENT],
+            embeds=[Embed.from_dict(entry["embed"]) for entry in batch],
+        )
+        self.counters["messages"] += 1
+        self.counters["entries"] += len(batch)
+
+    async def flush_once(self) -> None:
+        batch = self._take_batch()
+        if not batch:
+            return
+        try:
+            await self._send_batch(batch)
+        except HTTPException as e:
+            if 400 <= e.status < 500 and e.status != 429:
+                # Discord가 받지 않는 로그가 섞여 있으면 하나씩 보내고, 실패한 로그만 버림
+                await self._send_each(batch)
+                return
+            self._requeue(batch)
+            raise
+        except Exception:
+            self._requeue(batch)
+            raise
+
+    async def _send_each(self, batch: list[dict]) -> None:
+        for entry in batch:
+            try:
+                await self._send_batch([entry])
+            except HTTPException as e:
+                if not 400 <= e.status < 500 or e.status == 429:
+                    self._requeue([entry])
+                    raise
+                self.counters["dropped"] += 1
+                capture_exception(e)
+                _sink_log.error(f"Discord rejected log: {entry['content']}, {e}")
+
+    def _requeue(self, batch: list[dict]) -> None:
+        self.counters["failed"] += 1
+        self._buffer.extendleft(reversed(batch))
+
+    async def _wait(self) -> None:
+        self._wakeup.clear()
+        with contextlib.suppress(TimeoutError):
+            async with asyncio.timeout(self.flush_interval):
+                await self._wakeup.wait()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._refill()
+                if not self._buffer:
+                    await self._wait()
+                    continue
+                if len(self._buffer) < self.MAX_EMBEDS:
+                    await self._wait()
+                await self.flush_once()
+            except Exception as e:
+                capture_exception(e)
+                _sink_log.error(f"Log flush failed: {e}")
+                await asyncio.sleep(self.RETRY_DELAY)
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self._buffer),
+            "max_size": self.max_size,
+            "overflow": self.overflow,
+            **self.counters,
+        }
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        # 남은 로그는 보내 보고, 보내지 못하면 Redis에 옮겨 다음 실행에서 보냄
+        with contextlib.suppress(Exception):
+            while self._buffer:
+                await self.flush_once()
+        while self._buffer:
+            await self._spill(self._buffer.popleft())
@@ -0,0 +1,354 @@
+import asyncio
+import contextlib
+import heapq
+import itertools
+import re
+import time
+from enum import IntEnum
+from typing import Any
+
+from aiohttp import ClientResponse
+from discord import DiscordServerError, Forbidden, HTTPException, NotFound
+from sentry_sdk import capture_exception
+
+from app.core.circuit import guards
+from app.core.config import settings
+from app.core.http import HTTPSessionManager
+from app.logger import use_logger
+
+_sender_log = use_logger("discord-sender")
+
+# Discord는 rate limit bucket을 route와 major parameter(채널, 서버, webhook)로 구분
+_MAJOR_PARAMETER = re.compile(r"^/(channels|guilds)/(\d+)|^/webhooks/(\d+)/([^/]+)")
+_ID = re.compile(r"/\d+(?=/|$)")
+
+
+def split_route(method: str, path: str) -> tuple[str, str]:
+    """
+    요청을 (route, major parameter)로 나눕니다.
+    route에는 id나 token이 들어가지 않습니다.
+    """
+    match = _MAJOR_PARAMETER.match(path)
+    if match is None:
+        return f"{method} {_ID.sub('/{id}', path)}", ""
+    if match.group(1):
+        major, template = match.group(0), f"/{match.group(1)}/{{id}}"
+    else:
+        major, template = match.group(0), "/webhooks/{id}/{token}"
+    rest = _ID.sub("/{id}", path[match.end() :])
+    return f"{method} {template}{rest}", major
+
+
+class SendPriority(IntEnum):
+    TICKET = 0
+    LOG = 1
+
+
+class _Bucket:
+    __slots__ = ("name", "limit", "remaining", "reset_at", "in_flight")
+
+    def __init__(self) -> None:
+        self.name: str | None = None
+        self.limit: int | None = None
+        # 헤더를 받기 전에는 한 번에 하나씩만 보냄
+        self.remaining = 1
+        self.reset_at = 0.0
+        self.in_flight = 0
+
+    def ready(self, now: float) -> bool:
+        return self.remaining > 0 or (
+            now >= self.reset_at and (self.limit or 1) > self.in_flight
+        )
+
+    def acquire(self, now: float) -> None:
+        if self.remaining <= 0 and now >= self.reset_at:
+            self.remaining = (self.limit or 1) - self.in_flight
+        self.remaining -= 1
+        self.in_flight += 1
+
+    def update(self, headers, now: float) -> None:
+        if "X-RateLimit-Remaining" not in headers:
+            return
+        self.name = headers.get("X-RateLimit-Bucket", self.name)
+        self.limit = int(headers.get("X-RateLimit-Limit", self.limit or 1))
+        # 아직 응답을 받지 못한 다른 요청만큼 빼고 계산
+        self.remaining = int(headers["X-RateLimit-Remaining"]) - (self.in_flight - 1)
+        self.reset_at = now + float(headers.get("X-RateLimit-Reset-After", 0))
+
+
+class _Request:
+    __slots__ = (
+        "priority",
+        "seq",
+        "route",
+        "major",
+        "method",
+        "path",
+        "payload",
+        "future",
+        "queued_at",
+        "attempts",
+    )
+
+    def __init__(
+        self, priority: int, seq: int, method: str, path: str, payload: Any
+    ) -> None:
+        self.priority = priority
+        self.seq = seq
+        self.route, self.major = split_route(method, path)
+        self.method = method
+        self.path = path
+        self.payload = payload
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.queued_at = time.monotonic()
+        self.attempts = 0
+
+    def __lt__(self, other: "_Request") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class DiscordSender:
+    """
+    Discord REST 요청을 rate limit bucket에 맞춰 보냅니다.
+    bucket은 route와 major parameter로 구분하고, X-RateLimit-Bucket 헤더를 받은 뒤에는
+    Discord가 알려준 bucket hash와 major parameter로 구분합니다.
+    응답의 X-RateLimit-* 헤더로 bucket의 남은 요청 수와 초기화 시각을 기록하고,
+    bucket이 비었으면 요청을 대기열에 두었다가 초기화되는 시각에 보냅니다.
+    대기 중인 요청과 보내는 중인 요청이 없고 초기화 시각이 지난 bucket은 정리합니다.
+    보낼 수 있는 요청 중에서는 우선순위(SendPriority)가 높은 요청부터 보냅니다.
+    """
+
+    # 429를 이 횟수보다 많이 받으면 포기
+    MAX_ATTEMPTS = 5
+    WAIT_SAMPLES = 1000
+
+    def __init__(self, http: HTTPSessionManager) -> None:
+        self._http = http
+        self._guard = guards.get("discord")
+        self._seq = itertools.count()
+        # route -> Discord bucket hash
+        self._route_buckets: dict[str, str] = {}
+        self._buckets: dict[str, _Bucket] = {}
+        self._queues: dict[str, list[_Request]] = {}
+        self._global_reset_at = 0.0
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._requests: set[asyncio.Task] = set()
+        self._waits: list[float] = []
+        self.counters = {
+            "sent": 0,
+            "failed": 0,
+            "rate_limited": 0,
+            "global_rate_limited": 0,
+        }
+
+    def _session(self):
+        return self._http.session(
+            "discord",
+            headers={"Authorization": f"Bot {settings.DISCORD_BOT_TOKEN}"},
+        )
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        payload: Any = None,
+        priority: SendPriority = SendPriority.LOG,
+    ) -> Any:
+        item = _Request(priority, next(self._seq), method, path, payload)
+        self._push(item)
+        # lifespan 밖에서 사용하는 경우
+        self.start()
+        return await item.future
+
+    def _bucket_key(self, item: _Request) -> str:
+        return f"{self._route_buckets.get(item.route, item.route)}:{item.major}"
+
+    def _push(self, item: _Request) -> None:
+        heapq.heappush(self._queues.setdefault(self._bucket_key(item), []), item)
+        self._wakeup.set()
+
+    def _learn_bucket(self, item: _Request, bucket: _Bucket) -> None:
+        # 처음 받은 bucket hash면 route 기준으로 쌓인 상태와 대기열을 hash 기준으로 옮김
+        if bucket.name is None or self._route_buckets.get(item.route) == bucket.name:
+            return
+        old_key = self._bucket_key(item)
+        self._route_buckets[item.route] = bucket.name
+        new_key = self._bucket_key(item)
+        if self._buckets.get(old_key) is bucket:
+            del self._buckets[old_key]
+        self._buckets.setdefault(new_key, bucket)
+        queue = self._queues.pop(old_key, None)
+        if queue:
+            merged = self._queues.setdefault(new_key, [])
+            merged.extend(queue)
+            heapq.heapify(merged)
+
+    def _prune(self, now: float) -> None:
+        for key, bucket in list(self._buckets.items()):
+            if (
+                key not in self._queues
+                and bucket.in_flight == 0
+                and now >= bucket.reset_at
+            ):
+                del self._buckets[key]
+
+    def _dispatch(self, key: str) -> None:
+        item = heapq.heappop(self._queues[key])
+        if not self._queues[key]:
+            del self._queues[key]
+        bucket = self._buckets.setdefault(key, _Bucket())
+        bucket.acquire(time.monotonic())
+        self._record_wait(time.monotonic() - item.queued_at)
+        task = asyncio.create_task(self._execute(item, bucket))
+        self._requests.add(task)
+        task.add_done_callback(self._requests.discard)
+
+    def _dispatch_ready(self) -> float | None:
+        """
+        보낼 수 있는 요청을 모두 보내고, 다음 bucket이 초기화될 때까지 남은 시간을 반환합니다.
+        """
+        while True:
+            now = time.monotonic()
+            if now < self._global_reset_at:
+                return self._global_reset_at - now
+            ready = [
+                (queue[0], key)
+                for key, queue in self._queues.items()
+                if key not in self._buckets or self._buckets[key].ready(now)
+            ]
+            if not ready:
+                break
+            self._dispatch(min(ready)[1])
+        self._prune(now)
+        resets = [
+            self._buckets[key].reset_at - now
+            for key in self._queues
+            if key in self._buckets and self._buckets[key].in_flight == 0
+        ]
+        return max(0.0, min(resets)) if resets else None
+
+    async def _execute(self, item: _Request, bucket: _Bucket) -> None:
+        item.attempts += 1
+        try:
+            async with (
+                self._guard.call() as call,
+                self._session().request(
+                    item.method,
+                    f"{settings.DISCORD_API_URL}{item.path}",
+                    json=item.payload,
+                ) as response,
+            ):
+                now = time.monotonic()
+                bucket.update(response.headers, now)
+                self._learn_bucket(item, bucket)
+                data = await self._read(response)
+                if response.status == 429 and item.attempts < self.MAX_ATTEMPTS:
+                    self._rate_limited(bucket, response, data, now)
+                    self._push(item)
+                    return
+                if response.status >= 500:
+                    call.fail()
+                    raise DiscordServerError(response, data)
+                if response.status >= 400:
+                    raise {403: Forbidden, 404: NotFound}.get(
+                        response.status, HTTPException
+                    )(response, data)
+            self.counters["sent"] += 1
+            if not item.future.done():
+                item.future.set_result(data)
+        except Exception as e:
+            self.counters["failed"] += 1
+            if not item.future.done():
+                item.future.set_exception(e)
+        finally:
+            bucket.in_flight -= 1
+            self._wakeup.set()
+
+    @staticmethod
+    async def _read(response: ClientResponse) -> Any:
+        if response.content_type == "application/json":
+            return await response.json()
+        return await response.text()
+
+    def _rate_limited(
+        self, bucket: _Bucket, response: ClientResponse, data: Any, now: float
+    ) -> None:
+        retry_after = float(
+            data.get("retry_after")
+            if isinstance(data, dict) and data.get("retry_after") is not None
+            else response.headers.get("Retry-After", 1)
+        )
+        if response.headers.get("X-RateLimit-Global") or (
+            isinstance(data, dict) and data.get("global")
+        ):
+            self.counters["global_rate_limited"] += 1
+            self._global_reset_at = now + retry_after
+        else:
+            self.counters["rate_limited"] += 1
+            bucket.remaining = 0
+            bucket.reset_at = now + retry_after
+        _sender_log.warning(
+            f"Discord rate limited on {bucket.name or 'unknown bucket'}, "
+            f"retry after {retry_after}s"
+        )
+
+    def _record_wait(self, seconds: float) -> None:
+        self._waits.append(seconds)
+        if len(self._waits) > self.WAIT_SAMPLES:
+            del self._waits[: len(self._waits) - self.WAIT_SAMPLES]
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                self._wakeup.clear()
+                delay = self._dispatch_ready()
+                with contextlib.suppress(TimeoutError):
+                    async with asyncio.timeout(delay):
+                        await self._wakeup.wait()
+            except Exception as e:
+                capture_exception(e)
+                _sender_log.error(f"Discord sender failed: {e}")
+                await asyncio.sleep(1)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        waits = sorted(self._waits)
+        queued = {priority.name.lower(): 0 for priority in SendPriority}
+        for queue in self._queues.values():
+            for item in queue:
+                queued[SendPriority(item.priority).name.lower()] += 1
+        return {
+            "queued": queued,
+            "in_flight": len(self._requests),
+            "global_wait": round(max(0.0, self._global_reset_at - now), 3),
+            "wait_ms": {
+                "avg": round(sum(waits) / len(waits) * 1000, 1) if waits else 0,
+                "p95": round(waits[int(len(waits) * 0.95)] * 1000, 1) if waits else 0,
+                "max": round(waits[-1] * 1000, 1) if waits else 0,
+            },
+            "buckets": len(self._buckets),
+            "exhausted_buckets": sum(
+                1 for bucket in self._buckets.values() if not bucket.ready(now)
+            ),
+            **self.counters,
+        }
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        if self._requests:
+            await asyncio.gather(*self._requests, return_exceptions=True)
+        # 기다리는 호출자가 없을 수도 있으므로 예외 대신 취소
+        for queue in self._queues.values():
+            for item in queue:
+                item.future.cancel()
+        self._queues.clear()
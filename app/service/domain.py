@@ -62,28 +62,58 @@ class DomainService:
     @staticmethod
     async def approved_ticket(
         ticket_id: str,
-    ) -> tuple[DomainTicketEntity, DomainEntity]:
+    ) -> tuple[DomainTicketEntity, DomainEntity] | None:
+        """
+        대기 중인 티켓을 승인하고 도메인을 만듭니다. 이미 처리된 티켓이면 None을 반환합니다.
+        """
+        # 동시에 승인하거나 두 번 눌러도 한 요청만 대기 상태에서 승인으로 바꿀 수 있음
+        updated = await DomainTicketEntity.filter(
+            id=ticket_id, status=DomainTicketStatus.PENDING
+        ).update(status=DomainTicketStatus.APPROVED)
+        if not updated:
+            return None
         ticket = await DomainTicketEntity.get(id=ticket_id)
-        new_domain_entity = await DomainEntity.create(
-            name=ticket.name,
-            content=ticket.content,
-            record_type=ticket.record_type,
-            data=ticket.data,
-            proxied=ticket.proxied,
-            ttl=ticket.ttl,
-        )
-        ticket.status = DomainTicketStatus.APPROVED
-        await ticket.save()
+        try:
+            new_domain_entity = await DomainEntity.create(
+                name=ticket.name,
+                content=ticket.content,
+                record_type=ticket.record_type,
+                data=ticket.data,
+                proxied=ticket.proxied,
+                ttl=ticket.ttl,
+            )
+        except Exception:
+            ticket.status = DomainTicketStatus.PENDING
+            await ticket.save()
+            raise
         return ticket, new_domain_entity
 
+    @staticmethod
+    async def rollback_approved_ticket(
+        ticket: DomainTicketEntity,
+        domain: DomainEntity,
+        user: UserEntity | None = None,
+    ) -> None:
+        # 승인 도중 실패한 티켓을 대기 상태로 돌리고 만들어 둔 도메인을 삭제
+        if user is not None:
+            await user.domains.remove(domain)
+        await domain.delete()
+        ticket.status = DomainTicketStatus.PENDING
+        await ticket.save()
+
     @staticmethod
     async def reject_ticket(
         ticket_id: str,
-    ) -> DomainTicketEntity:
-        ticket = await DomainTicketEntity.get(id=ticket_id)
-        ticket.status = DomainTicketStatus.REJECTED
-        await ticket.save()
-        return ticket
+    ) -> DomainTicketEntity | None:
+        """
+        대기 중인 티켓을 거절합니다. 이미 처리된 티켓이면 None을 반환합니다.
+        """
+        updated = await DomainTicketEntity.filter(
+            id=ticket_id, status=DomainTicketStatus.PENDING
+        ).update(status=DomainTicketStatus.REJECTED)
+        if not updated:
+            return None
+        return await DomainTicketEntity.get(id=ticket_id)
 
     @staticmethod
     async def get_domain(user: UserEntity, domain_name: str) -> DomainEntity | None:
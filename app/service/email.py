@@ -1,19 +1,19 @@
 import contextlib
 from typing import ClassVar, Any
 
-from aiohttp import ClientSession, BasicAuth
+from aiohttp import BasicAuth
 from sentry_sdk import capture_exception
 
 from app.core.response import APIError
 from app.core.error import ErrorCode
+from app.core.circuit import guards
 from app.core.config import settings
+from app.core.http import HTTPSessionManager
 from app.logger import use_logger
 
 _http_log = use_logger("aiohttp-request")
 _email_log = use_logger("email-request-service")
 
-INTERNAL_API_VERSION: int = 1
-
 
 def content_type(response: Any) -> Any:
     if response.content_type == "text/html":
@@ -24,18 +24,25 @@ def content_type(response: Any) -> Any:
 
 
 class EmailRequesterService:
-    API: ClassVar[str] = f"https://api.forwardemail.net/v{INTERNAL_API_VERSION}"
+    API: ClassVar[str] = settings.EMAIL_API_URL
 
-    def __init__(self):
-        self._session = ClientSession(
+    def __init__(self, http: HTTPSessionManager) -> None:
+        self._guard = guards.get("email")
+        self._session = http.session(
+            "email",
             auth=BasicAuth(
                 login=settings.EMAIL_API_KEY,
-            )
+            ),
         )
 
     async def request(self, method: str, path: str, **kwargs):
         url = f"{self.API}{path}"
-        async with self._session.request(method, url, **kwargs) as response:
+        async with (
+            self._guard.call() as call,
+            self._session.request(method, url, **kwargs) as response,
+        ):
+            if response.status >= 500:
+                call.fail()
             _http_log.debug(
                 "%s %s with %s has returned %s",
                 method,
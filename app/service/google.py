@@ -1,7 +1,13 @@
+import asyncio
+
+import jwt
+from aiohttp import ClientError
+
+from app.core.circuit import guards
 from app.core.config import settings
 from app.logger import use_logger
 
-from aiogoogle import Aiogoogle, auth as aiogoogle_auth
+from aiogoogle import Aiogoogle, auth as aiogoogle_auth, excs as aiogoogle_excs
 
 _log = use_logger("google-service")
 
@@ -14,11 +20,18 @@ class GoogleScope:
 
 
 class GoogleRequestService:
+    # JWK Set, 모르는 key id가 오면 PyJWKClient가 다시 받음
+    CERTS_URL = "https://www.googleapis.com/oauth2/v3/certs"
+    CERTS_LIFESPAN = 3600
+    ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+    PROFILE_CLAIMS = ("email", "name", "picture")
+
     def __init__(self) -> None:
         self.__google_credentials = aiogoogle_auth.creds.ClientCreds(
             client_id=settings.GOOGLE_CLIENT_ID,
             client_secret=settings.GOOGLE_CLIENT_SECRET,
             scopes=[
+                "openid",
                 GoogleScope["userinfo.email"],
                 GoogleScope["userinfo.profile"],
             ],
@@ -27,6 +40,10 @@ class GoogleRequestService:
         self._google_client = Aiogoogle(
             client_creds=self.__google_credentials,
         )
+        self._guard = guards.get("google")
+        self._jwk_client = jwt.PyJWKClient(
+            self.CERTS_URL, lifespan=self.CERTS_LIFESPAN, timeout=10
+        )
 
     async def get_authorization_url(self, state: str) -> str:
         return self._google_client.oauth2.authorization_url(
@@ -37,11 +54,68 @@ class GoogleRequestService:
         )
 
     async def fetch_user_credentials(self, code: str) -> dict:
-        return await self._google_client.oauth2.build_user_creds(
-            grant=code, client_creds=self.__google_credentials
-        )
+        async with self._guard.call() as call:
+            try:
+                return await self._google_client.oauth2.build_user_creds(
+                    grant=code, client_creds=self.__google_credentials
+                )
+            except aiogoogle_excs.HTTPError as e:
+                if e.res is None or e.res.status_code >= 500:
+                    call.fail()
+                raise
 
     async def fetch_user_info(self, user_credentials: dict) -> dict:
-        return await self._google_client.oauth2.get_me_info(
-            user_creds=user_credentials,
-        )
+        async with self._guard.call() as call:
+            try:
+                return await self._google_client.oauth2.get_me_info(
+                    user_creds=user_credentials,
+                )
+            except aiogoogle_excs.HTTPError as e:
+                if e.res is None or e.res.status_code >= 500:
+                    call.fail()
+                raise
+
+    async def _signing_key(self, id_token: str) -> jwt.PyJWK:
+        async with self._guard.call() as call:
+            try:
+                # PyJWKClient는 동기 요청이므로 이벤트 루프를 막지 않도록 thread에서 실행
+                return await asyncio.to_thread(
+                    self._jwk_client.get_signing_key_from_jwt, id_token
+                )
+            except jwt.PyJWKClientConnectionError:
+                call.fail()
+                raise
+
+    async def verify_id_token(self, id_token: str) -> dict:
+        """
+        ID token을 Google 인증서(JWK Set)로 검증하고 claim을 반환합니다.
+        검증할 수 없으면 ValueError를 발생시킵니다.
+        """
+        try:
+            signing_key = await self._signing_key(id_token)
+            return jwt.decode(
+                id_token,
+                signing_key,
+                algorithms=["RS256"],
+                audience=settings.GOOGLE_CLIENT_ID,
+                issuer=self.ISSUERS,
+                leeway=10,
+            )
+        except jwt.PyJWTError as e:
+            raise ValueError(str(e))
+
+    async def fetch_user_profile(self, code: str) -> dict:
+        """
+        인증 코드를 토큰으로 교환하고 ID token의 claim에서 사용자 정보를 가져옵니다.
+        ID token을 쓸 수 없을 때만 userinfo API를 호출합니다.
+        """
+        credentials = await self.fetch_user_credentials(code)
+        id_token = credentials.get("id_token")
+        if id_token:
+            try:
+                claims = await self.verify_id_token(id_token)
+                if all(claim in claims for claim in self.PROFILE_CLAIMS):
+                    return claims
+            except (ValueError, ClientError, asyncio.TimeoutError) as e:
+                _log.warning(f"ID token verification failed: {e}")
+        return await self.fetch_user_info(credentials)
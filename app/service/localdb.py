@@ -10,3 +10,6 @@ class LocalDBService:
 
     async def get_zone_id(self, domain: str) -> str:
         return self._domain_db["domains"][domain]["zone_id"]
+
+    async def zone_ids(self) -> list[str]:
+        return [domain["zone_id"] for domain in self._domain_db["domains"].values()]
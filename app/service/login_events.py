@@ -0,0 +1,161 @@
+import asyncio
+import contextlib
+import json
+import os
+import socket
+import time
+
+import redis.exceptions
+from sentry_sdk import capture_exception
+
+from app.core.redis import manager
+from app.entity import User as UserEntity
+from app.logger import use_logger
+from app.service.discord_interaction import DiscordRequester
+from app.service.email import EmailRequesterService
+
+_event_log = use_logger("login-event-service")
+
+
+class LoginEventService:
+    """
+    로그인 후처리(Discord 로그, 환영 이메일)를 Redis Stream에 작업 단위로 기록하고
+    consumer group으로 처리합니다. 요청은 기록만 하고 바로 응답합니다.
+    처리에 실패한 작업은 pending 상태로 남아 다시 시도되고, 여러 번 실패하면 버립니다.
+    """
+
+    KEY = "LOGIN_EVENTS"
+    GROUP = "login-side-effects"
+    MAX_LENGTH = 10000
+    READ_COUNT = 10
+    READ_BLOCK = 5000
+    # 이 시간(ms) 동안 ack되지 않은 작업은 다시 시도
+    RETRY_IDLE = 60000
+    MAX_DELIVERIES = 5
+    ERROR_DELAY = 1
+
+    def __init__(self, discord: DiscordRequester, email: EmailRequesterService) -> None:
+        self.redis = manager.get_connection()
+        self._discord = discord
+        self._email = email
+        self._consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self._handlers = {
+            "log_user_create": self._log_user_create,
+            "welcome_email": self._welcome_email,
+            "log_refresh_session": self._log_refresh_session,
+        }
+        self._task: asyncio.Task | None = None
+        self.counters = {"processed": 0, "failed": 0, "dropped": 0}
+
+    def _add(self, client, job: str, **data):
+        return client.xadd(
+            self.KEY,
+            {"job": job, "data": json.dumps(data)},
+            maxlen=self.MAX_LENGTH,
+            approximate=True,
+        )
+
+    async def user_created(self, email: str, name: str, avatar: str) -> None:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            self._add(pipe, "log_user_create", email=email, name=name, avatar=avatar)
+            self._add(pipe, "welcome_email", to_email=email, name=name)
+            await pipe.execute()
+
+    async def session_refreshed(self, user_id: str) -> None:
+        await self._add(self.redis, "log_refresh_session", user_id=user_id)
+
+    async def _log_user_create(self, data: dict) -> None:
+        await self._discord.create_log_user_create(**data)
+
+    async def _welcome_email(self, data: dict) -> None:
+        await self._email.send_welcome_email(**data)
+
+    async def _log_refresh_session(self, data: dict) -> None:
+        user = await UserEntity.get_or_none(id=data["user_id"])
+        if user is not None:
+            await self._discord.create_log_refresh_session(user=user)
+
+    async def _process(self, entry_id: bytes, fields: dict[bytes, bytes]) -> None:
+        try:
+            job = fields[b"job"].decode("utf-8")
+            await self._handlers[job](json.loads(fields[b"data"]))
+        except Exception as e:
+            self.counters["failed"] += 1
+            capture_exception(e)
+            _event_log.error(f"Login event {entry_id} failed: {e}")
+            return
+        await self.redis.xack(self.KEY, self.GROUP, entry_id)
+        self.counters["processed"] += 1
+
+    async def _retry_pending(self) -> None:
+        pending = await self.redis.xpending_range(
+            self.KEY, self.GROUP, min="-", max="+", count=100, idle=self.RETRY_IDLE
+        )
+        retry_ids = []
+        for item in pending:
+            if item["times_delivered"] >= self.MAX_DELIVERIES:
+                _event_log.error(f"Drop login event: {item['message_id']}")
+                await self.redis.xack(self.KEY, self.GROUP, item["message_id"])
+                self.counters["dropped"] += 1
+            else:
+                retry_ids.append(item["message_id"])
+        if not retry_ids:
+            return
+        # 다른 consumer(종료된 워커 포함)가 처리하지 못한 작업도 가져옴
+        entries = await self.redis.xclaim(
+            self.KEY, self.GROUP, self._consumer, self.RETRY_IDLE, retry_ids
+        )
+        for entry_id, fields in entries:
+            if fields:
+                await self._process(entry_id, fields)
+            else:
+                # stream 길이 제한으로 이미 지워진 작업
+                await self.redis.xack(self.KEY, self.GROUP, entry_id)
+
+    async def _consume(self) -> None:
+        retried_at = 0.0
+        while True:
+            try:
+                if time.monotonic() - retried_at > self.RETRY_IDLE / 2000:
+                    retried_at = time.monotonic()
+                    await self._retry_pending()
+                streams = await self.redis.xreadgroup(
+                    self.GROUP,
+                    self._consumer,
+                    {self.KEY: ">"},
+                    count=self.READ_COUNT,
+                    block=self.READ_BLOCK,
+                )
+                for _, entries in streams:
+                    await asyncio.gather(
+                        *(
+                            self._process(entry_id, fields)
+                            for entry_id, fields in entries
+                        )
+                    )
+            except Exception as e:
+                # CancelledError 외의 오류로 consumer가 끝나면 로그인 후처리가 멈추므로 계속 실행
+                capture_exception(e)
+                _event_log.error(f"Login event consumer error: {e}")
+                await asyncio.sleep(self.ERROR_DELAY)
+
+    def stats(self) -> dict:
+        return dict(self.counters)
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        try:
+            await self.redis.xgroup_create(self.KEY, self.GROUP, id="0", mkstream=True)
+        except redis.exceptions.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._task = asyncio.create_task(self._consume())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
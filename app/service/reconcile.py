@@ -0,0 +1,246 @@
+import asyncio
+import contextlib
+import json
+import uuid
+from datetime import datetime
+
+from sentry_sdk import capture_exception
+
+from app.core.config import settings
+from app.core.redis import manager
+from app.entity import Domain as DomainEntity
+from app.logger import use_logger
+from app.service.cloudflare import CloudflareRequestService
+from app.service.localdb import LocalDBService
+
+_reconcile_log = use_logger("dns-reconcile-service")
+
+COMMENT_PREFIX = "Domain ID: "
+
+
+class DNSReconciliationService:
+    """
+    Domain 엔티티와 Cloudflare zone 레코드를 주기적으로 비교합니다.
+    Cloudflare 레코드로 해시 테이블을 만들고 Domain 행을 id 순서로 나눠 읽으며 대조합니다.
+    진행 상황은 Redis에 저장되므로 중단되어도 다음 실행에서 이어서 진행합니다.
+    """
+
+    KEY = "DNS_RECONCILE"
+    LOCK_KEY = "DNS_RECONCILE_LOCK"
+
+    def __init__(
+        self, cloudflare: CloudflareRequestService, localdb: LocalDBService
+    ) -> None:
+        self.redis = manager.get_connection()
+        self._cloudflare = cloudflare
+        self._localdb = localdb
+        self._task: asyncio.Task | None = None
+
+    def _keys(self, zone_id: str) -> dict[str, str]:
+        return {
+            "checkpoint": f"{self.KEY}:{zone_id}:CHECKPOINT",
+            "matched": f"{self.KEY}:{zone_id}:MATCHED",
+            "issues": f"{self.KEY}:{zone_id}:ISSUES",
+            "result": f"{self.KEY}:{zone_id}:RESULT",
+        }
+
+    async def _load_zone_records(self, zone_id: str) -> dict[str, dict]:
+        records = {}
+        async for page in self._cloudflare.iter_records(zone_id):
+            for record in page:
+                records[record["id"]] = {
+                    "id": record["id"],
+                    "name": record["name"].lower(),
+                    "comment": record.get("comment") or "",
+                }
+            await asyncio.sleep(0)
+        return records
+
+    @staticmethod
+    def _compare(domain: dict, record: dict | None) -> dict | None:
+        if record is None:
+            return {
+                "kind": "missing",
+                "domain_id": domain["id"],
+                "name": domain["name"],
+                "record_id": domain["record_id"],
+            }
+        if record["name"] != domain["name"].lower():
+            return {
+                "kind": "name_mismatch",
+                "domain_id": domain["id"],
+                "name": domain["name"],
+                "record_id": record["id"],
+                "record_name": record["name"],
+            }
+        if record["comment"] != f"{COMMENT_PREFIX}{domain['id']}":
+            return {
+                "kind": "owner_mismatch",
+                "domain_id": domain["id"],
+                "name": domain["name"],
+                "record_id": record["id"],
+                "comment": record["comment"],
+            }
+        return None
+
+    async def reconcile_zone(self, main_domain: str, zone_id: str) -> dict:
+        keys = self._keys(zone_id)
+        records = await self._load_zone_records(zone_id)
+
+        # 이전 실행이 중단된 경우 이미 대조한 레코드와 커서를 복원
+        cursor = await self.redis.hget(keys["checkpoint"], "cursor")
+        cursor = cursor.decode("utf-8") if cursor else None
+        for record_id in await self.redis.smembers(keys["matched"]):
+            records.pop(record_id.decode("utf-8"), None)
+
+        while True:
+            query = DomainEntity.filter(name__iendswith=f".{main_domain}")
+            if cursor:
+                query = query.filter(id__gt=cursor)
+            rows = (
+                await query.order_by("id")
+                .limit(settings.DNS_RECONCILE_CHUNK_SIZE)
+                .values("id", "name", "record_id")
+            )
+            if not rows:
+                break
+
+            matched, issues = [], []
+            for row in rows:
+                row["id"] = str(row["id"])
+                record = (
+                    records.pop(row["record_id"], None) if row["record_id"] else None
+                )
+                if record is not None:
+                    matched.append(record["id"])
+                issue = self._compare(row, record)
+                if issue is not None:
+                    issues.append(json.dumps(issue))
+            cursor = rows[-1]["id"]
+
+            async with self.redis.pipeline(transaction=True) as pipe:
+                if matched:
+                    pipe.sadd(keys["matched"], *matched)
+                if issues:
+                    pipe.rpush(keys["issues"], *issues)
+                pipe.hset(keys["checkpoint"], "cursor", cursor)
+                await pipe.execute()
+            await asyncio.sleep(0)
+
+        # Domain ID 주석이 달렸지만 어떤 Domain에서도 참조하지 않는 레코드
+        # 승인 도중이라 record_id가 아직 저장되지 않은 Domain의 레코드는 제외
+        candidates = [
+            (record["comment"].removeprefix(COMMENT_PREFIX), record)
+            for record in records.values()
+            if record["comment"].startswith(COMMENT_PREFIX)
+        ]
+        domain_ids = set()
+        for domain_id, _record in candidates:
+            with contextlib.suppress(ValueError):
+                domain_ids.add(uuid.UUID(domain_id))
+        existing = set()
+        if domain_ids:
+            existing = {
+                str(domain_id)
+                for domain_id in await DomainEntity.filter(
+                    id__in=list(domain_ids)
+                ).values_list("id", flat=True)
+            }
+        orphans = [
+            {
+                "kind": "orphan",
+                "record_id": record["id"],
+                "record_name": record["name"],
+                "comment": record["comment"],
+            }
+            for domain_id, record in candidates
+            if domain_id not in existing
+        ]
+        issues = [
+            json.loads(raw) for raw in await self.redis.lrange(keys["issues"], 0, -1)
+        ]
+        issues.extend(orphans)
+
+        repaired = 0
+        if settings.DNS_RECONCILE_REPAIR and issues:
+            repaired = await self._repair(zone_id, issues)
+
+        summary = {
+            "zone_id": zone_id,
+            "domain": main_domain,
+            "finished_at": datetime.now().isoformat(),
+            "issues": issues,
+            "repaired": repaired,
+        }
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(keys["result"], json.dumps(summary))
+            pipe.delete(keys["checkpoint"], keys["matched"], keys["issues"])
+            await pipe.execute()
+        _reconcile_log.info(
+            f"Zone {main_domain} reconciled: {len(issues)} issues, {repaired} repaired"
+        )
+        return summary
+
+    async def _repair(self, zone_id: str, issues: list[dict]) -> int:
+        # 누락된 레코드는 원래 값이 없어 복구하지 않고 보고만 함
+        batch = self._cloudflare.batch(zone_id)
+        for issue in issues:
+            if issue["kind"] == "orphan":
+                batch.delete(issue["record_id"], issue["record_id"])
+            elif issue["kind"] == "name_mismatch":
+                batch.update(
+                    issue["domain_id"], issue["record_id"], {"name": issue["name"]}
+                )
+            elif issue["kind"] == "owner_mismatch":
+                batch.update(
+                    issue["domain_id"],
+                    issue["record_id"],
+                    {"comment": f"{COMMENT_PREFIX}{issue['domain_id']}"},
+                )
+        if not len(batch):
+            return 0
+        results = await batch.submit()
+        return sum(1 for result in results if result["success"])
+
+    async def reconcile(self) -> list[dict]:
+        semaphore = asyncio.Semaphore(settings.DNS_RECONCILE_CONCURRENCY)
+
+        async def run(main_domain: str) -> dict | None:
+            async with semaphore:
+                zone_id = await self._localdb.get_zone_id(main_domain)
+                try:
+                    return await self.reconcile_zone(main_domain, zone_id)
+                except Exception as e:
+                    capture_exception(e)
+                    _reconcile_log.error(f"Zone {main_domain} reconcile failed: {e}")
+                    return None
+
+        domains = await self._localdb.available_domains()
+        results = await asyncio.gather(*(run(domain) for domain in domains))
+        return [result for result in results if result is not None]
+
+    async def _reconcile_loop(self) -> None:
+        while True:
+            try:
+                # 주기마다 한 워커만 실행
+                if await self.redis.set(
+                    self.LOCK_KEY, "1", nx=True, ex=settings.DNS_RECONCILE_INTERVAL
+                ):
+                    await self.reconcile()
+            except Exception as e:
+                capture_exception(e)
+                _reconcile_log.error(f"Reconcile failed: {e}")
+            await asyncio.sleep(settings.DNS_RECONCILE_INTERVAL)
+
+    async def start(self) -> None:
+        if settings.DNS_RECONCILE_INTERVAL <= 0:
+            return
+        self._task = asyncio.create_task(self._reconcile_loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
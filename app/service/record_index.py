@@ -0,0 +1,249 @@
+import asyncio
+import contextlib
+import json
+from typing import Awaitable, Callable
+
+from sentry_sdk import capture_exception
+
+from app.core.config import settings
+from app.core.pubsub import RedisPubSubHub
+from app.core.redis import manager
+from app.logger import use_logger
+
+_index_log = use_logger("zone-record-index")
+
+RecordLoader = Callable[[str], Awaitable[list[dict]]]
+
+# KEYS[1]: name 해시, KEYS[2]: record id 해시
+# ARGV[1]: name, ARGV[2]: record id, ARGV[3]: record json
+_PUT_RECORD_SCRIPT = """
+local previous = redis.call('HGET', KEYS[2], ARGV[2])
+if previous and previous ~= ARGV[1] then
+    local raw = redis.call('HGET', KEYS[1], previous)
+    if raw then
+        local records = cjson.decode(raw)
+        records[ARGV[2]] = nil
+        if next(records) == nil then
+            redis.call('HDEL', KEYS[1], previous)
+        else
+            redis.call('HSET', KEYS[1], previous, cjson.encode(records))
+        end
+    end
+end
+local raw = redis.call('HGET', KEYS[1], ARGV[1])
+local records = raw and cjson.decode(raw) or {}
+records[ARGV[2]] = cjson.decode(ARGV[3])
+redis.call('HSET', KEYS[1], ARGV[1], cjson.encode(records))
+redis.call('HSET', KEYS[2], ARGV[2], ARGV[1])
+"""
+
+# KEYS[1]: name 해시, KEYS[2]: record id 해시
+# ARGV[1]: record id
+_REMOVE_RECORD_SCRIPT = """
+local name = redis.call('HGET', KEYS[2], ARGV[1])
+if not name then
+    return 0
+end
+redis.call('HDEL', KEYS[2], ARGV[1])
+local raw = redis.call('HGET', KEYS[1], name)
+if raw then
+    local records = cjson.decode(raw)
+    records[ARGV[1]] = nil
+    if next(records) == nil then
+        redis.call('HDEL', KEYS[1], name)
+    else
+        redis.call('HSET', KEYS[1], name, cjson.encode(records))
+    end
+end
+return 1
+"""
+
+
+def _snapshot(record: dict) -> dict:
+    return {
+        "id": record["id"],
+        "name": record["name"].lower(),
+        "type": record.get("type"),
+        "content": record.get("content"),
+    }
+
+
+class ZoneRecordIndex:
+    """
+    zone별 DNS 레코드 이름 목록을 워커 메모리와 Redis에 함께 둡니다.
+    레코드를 추가하거나 삭제하면 pub/sub으로 알려 다른 워커의 메모리에도 반영합니다.
+    """
+
+    KEY = "ZONE_RECORD"
+    ID_KEY = "ZONE_RECORD_ID"
+    SYNC_LOCK_KEY = "ZONE_RECORD_SYNC"
+    CHANNEL = "ZONE_RECORD_CHANGED"
+
+    def __init__(self, pubsub: RedisPubSubHub) -> None:
+        self.redis = manager.get_connection()
+        self._pubsub = pubsub
+        self._put_script = self.redis.register_script(_PUT_RECORD_SCRIPT)
+        self._remove_script = self.redis.register_script(_REMOVE_RECORD_SCRIPT)
+        # zone_id -> name -> record_id -> record
+        self._records: dict[str, dict[str, dict[str, dict]]] = {}
+        # zone_id -> record_id -> name
+        self._names: dict[str, dict[str, str]] = {}
+        self._task: asyncio.Task | None = None
+
+    def _keys(self, zone_id: str) -> list[str]:
+        return [f"{self.KEY}:{zone_id}", f"{self.ID_KEY}:{zone_id}"]
+
+    def is_warm(self, zone_id: str) -> bool:
+        return zone_id in self._records
+
+    def _replace_local(self, zone_id: str, records: list[dict]) -> None:
+        by_name: dict[str, dict[str, dict]] = {}
+        by_id: dict[str, str] = {}
+        for record in records:
+            snapshot = _snapshot(record)
+            by_name.setdefault(snapshot["name"], {})[snapshot["id"]] = snapshot
+            by_id[snapshot["id"]] = snapshot["name"]
+        self._records[zone_id] = by_name
+        self._names[zone_id] = by_id
+
+    async def replace(self, zone_id: str, records: list[dict]) -> None:
+        self._replace_local(zone_id, records)
+        name_key, id_key = self._keys(zone_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(name_key, id_key)
+            if self._records[zone_id]:
+                pipe.hset(
+                    name_key,
+                    mapping={
+                        name: json.dumps(value)
+                        for name, value in self._records[zone_id].items()
+                    },
+                )
+                pipe.hset(id_key, mapping=self._names[zone_id])
+            await pipe.execute()
+
+    async def load(self, zone_id: str) -> bool:
+        raw = await self.redis.hgetall(f"{self.KEY}:{zone_id}")
+        if not raw:
+            return False
+        records = [
+            record for value in raw.values() for record in json.loads(value).values()
+        ]
+        self._replace_local(zone_id, records)
+        return True
+
+    async def contains(self, zone_id: str, name: str) -> bool | None:
+        """
+        name에 해당하는 레코드가 있는지 확인합니다.
+        인덱스가 아직 채워지지 않은 zone이면 None을 반환합니다.
+        """
+        name = name.lower()
+        if not self.is_warm(zone_id) and not await self.load(zone_id):
+            return None
+        if name in self._records[zone_id]:
+            return True
+        # 다른 워커에서 생성된 레코드는 Redis에만 있을 수 있음
+        return bool(await self.redis.hexists(f"{self.KEY}:{zone_id}", name))
+
+    def _put_local(self, zone_id: str, snapshot: dict) -> None:
+        if not self.is_warm(zone_id):
+            return
+        self._discard_local(zone_id, snapshot["id"])
+        self._records[zone_id].setdefault(snapshot["name"], {})[
+            snapshot["id"]
+        ] = snapshot
+        self._names[zone_id][snapshot["id"]] = snapshot["name"]
+
+    async def put(self, zone_id: str, record: dict) -> None:
+        snapshot = _snapshot(record)
+        self._put_local(zone_id, snapshot)
+        await self._put_script(
+            keys=self._keys(zone_id),
+            args=[snapshot["name"], snapshot["id"], json.dumps(snapshot)],
+        )
+        await self._publish(zone_id, record=snapshot)
+
+    async def remove(self, zone_id: str, record_id: str) -> None:
+        if self.is_warm(zone_id):
+            self._discard_local(zone_id, record_id)
+        await self._remove_script(keys=self._keys(zone_id), args=[record_id])
+        await self._publish(zone_id, record_id=record_id)
+
+    async def _publish(self, zone_id: str, **change) -> None:
+        try:
+            await self._pubsub.publish(
+                self.CHANNEL, json.dumps({"zone_id": zone_id, **change})
+            )
+        except Exception as e:
+            # Redis에는 반영되었으므로 다른 워커는 다음 동기화 때 맞춰짐
+            capture_exception(e)
+            _index_log.error(f"Zone {zone_id} change publish failed: {e}")
+
+    async def _on_message(self, data: bytes) -> None:
+        change = json.loads(data)
+        zone_id = change["zone_id"]
+        if not self.is_warm(zone_id):
+            return
+        if "record" in change:
+            self._put_local(zone_id, change["record"])
+        else:
+            self._discard_local(zone_id, change["record_id"])
+
+    async def _on_reconnect(self) -> None:
+        # 연결이 끊긴 동안의 변경을 놓쳤을 수 있으므로 Redis에서 다시 읽음
+        for zone_id in list(self._records):
+            if not await self.load(zone_id):
+                self._records.pop(zone_id, None)
+                self._names.pop(zone_id, None)
+
+    def _discard_local(self, zone_id: str, record_id: str) -> None:
+        name = self._names[zone_id].pop(record_id, None)
+        if name is None:
+            return
+        records = self._records[zone_id].get(name, {})
+        records.pop(record_id, None)
+        if not records:
+            self._records[zone_id].pop(name, None)
+
+    async def sync(self, zone_id: str, loader: RecordLoader) -> None:
+        # 한 TTL 동안 Cloudflare 동기화는 한 워커만 수행하고, 나머지는 Redis에서 읽음
+        acquired = await self.redis.set(
+            f"{self.SYNC_LOCK_KEY}:{zone_id}",
+            "1",
+            nx=True,
+            ex=settings.CLOUDFLARE_RECORD_INDEX_TTL,
+        )
+        if not acquired and await self.load(zone_id):
+            return
+        records = await loader(zone_id)
+        await self.replace(zone_id, records)
+        _index_log.info(f"Zone {zone_id} synced ({len(records)} records)")
+
+    async def start(self, zone_ids: list[str], loader: RecordLoader) -> None:
+        self._pubsub.on_reconnect(self._on_reconnect)
+        await self._pubsub.subscribe(self.CHANNEL, self._on_message)
+        for zone_id in zone_ids:
+            try:
+                await self.sync(zone_id, loader)
+            except Exception as e:
+                capture_exception(e)
+                _index_log.error(f"Zone {zone_id} warm-up failed: {e}")
+        self._task = asyncio.create_task(self._resync_loop(zone_ids, loader))
+
+    async def _resync_loop(self, zone_ids: list[str], loader: RecordLoader) -> None:
+        while True:
+            await asyncio.sleep(settings.CLOUDFLARE_RECORD_INDEX_TTL)
+            for zone_id in zone_ids:
+                try:
+                    await self.sync(zone_id, loader)
+                except Exception as e:
+                    capture_exception(e)
+                    _index_log.error(f"Zone {zone_id} resync failed: {e}")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
@@ -1,27 +1,61 @@
+import asyncio
+import contextlib
+import functools
+import hashlib
+import json
+import time
 import uuid
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
+
+import jwt
 
 from fastapi import status
 from starlette.websockets import WebSocket
 
+from app.core.config import settings
 from app.core.error import ErrorCode
+from app.core.pubsub import MessageHandler, RedisPubSubHub
 from app.core.response import APIError
 from app.core.websocket import ConnectionManager
 
 from app.core.string import generate_token
 from app.core.redis import manager
 from app.logger import use_logger
+from app.schema.session import LoginSession
+from app.service.token_revocation import TokenRevocationService
 
 _login_log = use_logger("login-session-service")
 
+# KEYS[1]: 토큰 key
+# ARGV[1]: 만료 시간(초), ARGV[2]: 갱신 기준 TTL(초)
+# 토큰이 있으면 {user id, 갱신 여부}를 반환하고, 남은 TTL이 기준보다 작을 때만 만료 시간을 갱신합니다.
+_AUTHENTICATE_SCRIPT = """
+local user_id = redis.call('GET', KEYS[1])
+if not user_id then
+    return false
+end
+if tonumber(ARGV[2]) > 0 and redis.call('TTL', KEYS[1]) < tonumber(ARGV[2]) then
+    redis.call('EXPIRE', KEYS[1], tonumber(ARGV[1]))
+    return {user_id, 1}
+end
+return {user_id, 0}
+"""
+
 
 class LoginSessionService:
     KEY = "LOGIN_SESSION"
     EXPIRATION = timedelta(minutes=5)
+    # 세션별 채널, 구독자가 연결된 워커만 구독
+    NOTIFY_CHANNEL = "LOGIN_SESSION_NOTIFY"
+    # 세션당 토큰을 한 번만 발급하도록 먼저 선점한 요청만 발급
+    ISSUED_KEY = "LOGIN_SESSION_ISSUED"
 
-    def __init__(self, websocket: ConnectionManager) -> None:
+    def __init__(self, websocket: ConnectionManager, pubsub: RedisPubSubHub) -> None:
         self.redis = manager.get_connection()
         self.subscribe_websocket = websocket
+        self._pubsub = pubsub
+        # session id -> (구독자 id, pub/sub handler, websocket)
+        self._subscribers: dict[str, tuple[str, MessageHandler, WebSocket]] = {}
 
     async def create_new_session(
         self,
@@ -31,32 +65,40 @@ class LoginSessionService:
     ) -> str:
         if not session_id:
             session_id = str(uuid.uuid4())
-        session_data = {"type": "login", "user_id": "", "application_url": ""}
-        if application_url:
-            session_data["type"] = "application"
-            session_data["application_url"] = application_url
-        if user_id:
-            session_data["user_id"] = user_id
-        await self.redis.hmset(f"{self.KEY}:{session_id}", session_data)
-        await self.redis.expire(f"{self.KEY}:{session_id}", self.EXPIRATION)
+        session = LoginSession(
+            id=session_id,
+            type="application" if application_url else "login",
+            user_id=user_id or "",
+            application_url=application_url or "",
+        )
+        # 만료 시간 없이 남는 세션이 없도록 한 트랜잭션으로 저장
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(f"{self.KEY}:{session_id}", mapping=session.to_redis())
+            pipe.expire(f"{self.KEY}:{session_id}", self.EXPIRATION)
+            await pipe.execute()
         return session_id
 
+    async def get_session(self, session_id: str) -> LoginSession | None:
+        data = await self.redis.hgetall(f"{self.KEY}:{session_id}")
+        if not data:
+            return None
+        return LoginSession.from_redis(session_id, data)
+
     async def set_session_user(self, session_id: str, user_id: str) -> None:
         await self.redis.hset(f"{self.KEY}:{session_id}", "user_id", user_id)
 
-    async def get_session_user_id(self, session_id: str) -> str | None:
-        bytes_value = await self.redis.hget(f"{self.KEY}:{session_id}", "user_id")
-        return bytes_value.decode("utf-8") or None
-
-    async def get_session_type(self, session_id: str) -> str:
-        bytes_value = await self.redis.hget(f"{self.KEY}:{session_id}", "type")
-        return bytes_value.decode("utf-8")
-
-    async def get_session_application_url(self, session_id: str) -> str | None:
-        bytes_value = await self.redis.hget(
-            f"{self.KEY}:{session_id}", "application_url"
+    async def claim_token_issue(self, session_id: str) -> bool:
+        """
+        세션의 토큰 발급을 선점합니다. 이미 다른 요청이 선점했다면 False를 반환합니다.
+        """
+        return bool(
+            await self.redis.set(
+                f"{self.ISSUED_KEY}:{session_id}", 1, nx=True, ex=self.EXPIRATION
+            )
         )
-        return bytes_value.decode("utf-8") or None
+
+    async def release_token_issue(self, session_id: str) -> None:
+        await self.redis.delete(f"{self.ISSUED_KEY}:{session_id}")
 
     async def exist_session(self, session_id: str) -> bool:
         return await self.redis.exists(f"{self.KEY}:{session_id}")
@@ -64,56 +106,378 @@ class LoginSessionService:
     async def delete_session(self, session_id: str) -> None:
         await self.redis.delete(f"{self.KEY}:{session_id}")
 
-    async def push_token_to_session(self, session_id: str, token: str) -> None:
-        if self.subscribe_websocket.exist(session_id):
-            await self.subscribe_websocket.send_message(session_id, {"token": token})
-            await self.subscribe_websocket.disconnect(session_id)
+    def _channel(self, session_id: str) -> str:
+        return f"{self.NOTIFY_CHANNEL}:{session_id}"
+
+    async def push_token_to_session(self, session_id: str, tokens: dict) -> bool:
+        """
+        어느 워커에 연결된 구독자든 토큰을 전달하고, 받은 구독자가 있었는지 반환합니다.
+        """
+        message = {"type": "token", "data": {"token": tokens["access_token"], **tokens}}
+        receivers = await self._pubsub.publish(
+            self._channel(session_id), json.dumps(message)
+        )
+        return receivers > 0
+
+    async def exist_subscriber(self, session_id: str) -> bool:
+        # 다른 워커에 연결된 구독자도 포함
+        channels = await self.redis.pubsub_numsub(self._channel(session_id))
+        return bool(channels and channels[0][1])
+
+    @contextlib.asynccontextmanager
+    async def token_waiter(self, session_id: str):
+        """
+        세션으로 전달되는 토큰을 받을 future를 반환합니다.
+        구독을 마친 뒤 반환하므로, 이후에 세션 상태를 확인하면 그 사이 전달된 토큰을 놓치지 않습니다.
+        """
+        future = asyncio.get_running_loop().create_future()
 
-    def exist_subscriber(self, session_id: str) -> bool:
-        return self.subscribe_websocket.exist(session_id)
+        async def handler(data: bytes) -> None:
+            message = json.loads(data)
+            if message["type"] == "token" and not future.done():
+                future.set_result(message["data"])
 
-    async def subscribe_session(self, session_id: str, websocket: WebSocket) -> None:
-        if self.exist_subscriber(session_id):
+        await self._pubsub.subscribe(self._channel(session_id), handler)
+        try:
+            yield future
+        finally:
+            await self._pubsub.unsubscribe(self._channel(session_id), handler)
+
+    async def _deliver(self, session_id: str, data: bytes) -> None:
+        message = json.loads(data)
+        subscriber = self._subscribers.get(session_id)
+        if subscriber is None:
+            return
+        if message["type"] == "token":
+            await self.subscribe_websocket.send_message(session_id, message["data"])
+            await self._close_local(session_id)
+        elif message["subscriber"] != subscriber[0]:
+            await self._close_local(
+                session_id,
+                code=status.WS_1001_GOING_AWAY,
+                reason="New subscriber is connected",
+            )
+
+    async def _close_local(self, session_id: str, **kwargs) -> None:
+        subscriber = self._subscribers.pop(session_id, None)
+        if subscriber is not None:
+            await self._pubsub.unsubscribe(self._channel(session_id), subscriber[1])
+        if self.subscribe_websocket.exist(session_id):
             try:
-                await self.subscribe_websocket.disconnect(
-                    session_id,
-                    code=status.WS_1001_GOING_AWAY,
-                    reason="New subscriber is connected",
-                )
+                await self.subscribe_websocket.disconnect(session_id, **kwargs)
             except Exception as e:
-                pass
+                self.subscribe_websocket.remove(session_id)
+
+    async def subscribe_session(
+        self, session_id: str, websocket: WebSocket, heartbeat: bool = False
+    ) -> bool:
+        """
+        websocket을 세션 구독자로 등록합니다. 연결 수 제한에 걸리면 False를 반환합니다.
+        heartbeat가 True이면 주기적으로 앱 수준 ping 메시지를 보냅니다.
+        """
+        subscriber_id = uuid.uuid4().hex
+        # 다른 워커에 연결된 기존 구독자를 먼저 종료
+        await self._pubsub.publish(
+            self._channel(session_id),
+            json.dumps({"type": "replaced", "subscriber": subscriber_id}),
+        )
+        if self.subscribe_websocket.exist(session_id):
+            await self._close_local(
+                session_id,
+                code=status.WS_1001_GOING_AWAY,
+                reason="New subscriber is connected",
+            )
+        # 로그인 세션이 만료되면 연결도 정리
+        expires_in = await self.redis.ttl(f"{self.KEY}:{session_id}")
+        if expires_in <= 0:
+            expires_in = self.EXPIRATION.total_seconds()
+        if not await self.subscribe_websocket.connect(
+            session_id, websocket, expires_in, heartbeat
+        ):
+            _login_log.warning(f"Too many subscribers, rejected: {session_id}")
+            return False
         _login_log.info(f"Subscribe session: {session_id}, {websocket.client.host}")
-        await self.subscribe_websocket.connect(session_id, websocket)
+        handler = functools.partial(self._deliver, session_id)
+        self._subscribers[session_id] = (subscriber_id, handler, websocket)
+        await self._pubsub.subscribe(self._channel(session_id), handler)
+        return True
+
+    def touch_subscriber(self, session_id: str, websocket: WebSocket) -> None:
+        self.subscribe_websocket.touch(session_id, websocket)
+
+    async def unsubscribe_session(self, session_id: str, websocket: WebSocket) -> None:
+        subscriber = self._subscribers.get(session_id)
+        # 이미 새 구독자로 교체되었다면 유지
+        if subscriber is None or subscriber[2] is not websocket:
+            return
+        del self._subscribers[session_id]
+        await self._pubsub.unsubscribe(self._channel(session_id), subscriber[1])
+        if self.subscribe_websocket.get(session_id) is websocket:
+            self.subscribe_websocket.remove(session_id)
 
 
 class UserSessionService:
     KEY = "USER_SESSION"
     EXPIRATION = timedelta(weeks=10)
+    # 남은 TTL이 이보다 작을 때만 만료 시간을 갱신 (토큰당 하루 최대 한 번 쓰기)
+    REFRESH_THRESHOLD = EXPIRATION - timedelta(days=1)
+    # jwt 모드의 refresh 세션, 세션 id는 토큰에 그대로 보이므로 opaque 토큰과 key를 분리
+    JWT_SESSION_KEY = "USER_JWT_SESSION"
+    # user id -> 세션 목록 (score: 만료 시각)
+    INDEX_KEY = "USER_SESSION_INDEX"
+    ALGORITHM = "HS256"
 
-    def __init__(self) -> None:
+    def __init__(self, revocation: TokenRevocationService) -> None:
         self.redis = manager.get_connection()
+        self._authenticate_script = self.redis.register_script(_AUTHENTICATE_SCRIPT)
+        self._revocation = revocation
+
+    @property
+    def is_jwt_mode(self) -> bool:
+        return settings.USER_TOKEN_MODE == "jwt"
+
+    @staticmethod
+    def _is_jwt(token: str) -> bool:
+        # opaque 토큰은 영문자와 숫자로만 이루어져 있음
+        return token.count(".") == 2
+
+    def _encode(self, user_id: str, session_id: str, token_type: str) -> str:
+        now = datetime.now(timezone.utc)
+        lifetime = (
+            timedelta(seconds=settings.USER_ACCESS_TOKEN_TTL)
+            if token_type == "access"
+            else self.EXPIRATION
+        )
+        return jwt.encode(
+            {
+                "sub": str(user_id),
+                "sid": session_id,
+                "typ": token_type,
+                "iat": now,
+                "exp": now + lifetime,
+            },
+            settings.SECRET_KEY,
+            algorithm=self.ALGORITHM,
+        )
+
+    def _decode(self, token: str, token_type: str) -> dict | None:
+        try:
+            claims = jwt.decode(
+                token,
+                settings.SECRET_KEY,
+                algorithms=[self.ALGORITHM],
+                options={"require": ["exp", "sub", "sid", "typ"]},
+            )
+        except jwt.InvalidTokenError:
+            return None
+        if claims["typ"] != token_type:
+            return None
+        return claims
+
+    def _decode_unverified_exp(self, token: str) -> dict | None:
+        # 서명이 맞으면 만료된 토큰도 허용 (세션 폐기 등)
+        try:
+            return jwt.decode(
+                token,
+                settings.SECRET_KEY,
+                algorithms=[self.ALGORITHM],
+                options={"verify_exp": False},
+            )
+        except jwt.InvalidTokenError:
+            return None
+
+    def _member(self, token: str) -> str | None:
+        if self._is_jwt(token):
+            claims = self._decode_unverified_exp(token)
+            return f"jwt:{claims['sid']}" if claims else None
+        return f"opaque:{token}"
+
+    def _member_key(self, member: str) -> str:
+        token_type, value = member.split(":", 1)
+        if token_type == "jwt":
+            return f"{self.JWT_SESSION_KEY}:{value}"
+        return f"{self.KEY}:{value}"
+
+    async def _store_session(self, key: str, user_id: str, member: str) -> None:
+        """
+        세션 key와 사용자별 index를 한 트랜잭션으로 저장하고, index의 만료된 항목을 정리합니다.
+        """
+        index = f"{self.INDEX_KEY}:{user_id}"
+        now = time.time()
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.setex(key, self.EXPIRATION, str(user_id))
+            pipe.zadd(index, {member: now + self.EXPIRATION.total_seconds()})
+            pipe.zremrangebyscore(index, "-inf", now)
+            pipe.expire(index, self.EXPIRATION)
+            await pipe.execute()
+
+    async def _touch_session(
+        self, key: str, member: str, threshold: float
+    ) -> str | None:
+        """
+        세션 key의 user id를 반환하고, 남은 TTL이 threshold보다 작으면 만료 시간을 갱신합니다.
+        갱신한 경우에만 사용자별 index의 만료 시각도 갱신합니다.
+        """
+        result = await self._authenticate_script(
+            keys=[key], args=[int(self.EXPIRATION.total_seconds()), int(threshold)]
+        )
+        if not result:
+            return None
+        user_id, refreshed = result[0].decode("utf-8"), result[1]
+        if refreshed:
+            index = f"{self.INDEX_KEY}:{user_id}"
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.zadd(
+                    index, {member: time.time() + self.EXPIRATION.total_seconds()}
+                )
+                pipe.expire(index, self.EXPIRATION)
+                await pipe.execute()
+        return user_id
+
+    async def create_token_pair(self, user_id: str) -> dict:
+        """
+        jwt 모드에서는 access token과 refresh token을, opaque 모드에서는 access token만 반환합니다.
+        """
+        if not self.is_jwt_mode:
+            return {"access_token": await self.create_new_token(user_id)}
+
+        session_id = generate_token(32)
+        await self._store_session(
+            f"{self.JWT_SESSION_KEY}:{session_id}", str(user_id), f"jwt:{session_id}"
+        )
+        return {
+            "access_token": self._encode(user_id, session_id, "access"),
+            "refresh_token": self._encode(user_id, session_id, "refresh"),
+            "token_type": "bearer",
+            "expires_in": settings.USER_ACCESS_TOKEN_TTL,
+        }
 
     async def create_new_token(self, user_id: str) -> str:
+        if self.is_jwt_mode:
+            return (await self.create_token_pair(user_id))["access_token"]
         token = generate_token()
-        await self.redis.setex(f"{self.KEY}:{token}", self.EXPIRATION, str(user_id))
+        await self._store_session(
+            f"{self.KEY}:{token}", str(user_id), f"opaque:{token}"
+        )
         return token
 
+    async def refresh_access_token(self, refresh_token: str) -> dict | None:
+        claims = self._decode(refresh_token, "refresh")
+        if claims is None:
+            return None
+        # refresh token은 Redis의 세션이 살아 있을 때만 사용 가능
+        user_id = await self._touch_session(
+            f"{self.JWT_SESSION_KEY}:{claims['sid']}",
+            f"jwt:{claims['sid']}",
+            self.REFRESH_THRESHOLD.total_seconds(),
+        )
+        if user_id != claims["sub"]:
+            return None
+        return {
+            "access_token": self._encode(claims["sub"], claims["sid"], "access"),
+            "token_type": "bearer",
+            "expires_in": settings.USER_ACCESS_TOKEN_TTL,
+        }
+
     async def update_token(self, token: str) -> None:
+        if self._is_jwt(token):
+            return
         await self.redis.expire(f"{self.KEY}:{token}", self.EXPIRATION)
 
     async def get_user_id(self, token: str) -> str:
-        bytes_value = await self.redis.get(f"{self.KEY}:{token}")
-        if not bytes_value:
+        user_id = await self.authenticate(token, refresh=False)
+        if not user_id:
             raise APIError(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 error_code=ErrorCode.INVALID_SESSION,
                 message="Invalid session token",
             )
-        return bytes_value.decode("utf-8")
+        return user_id
+
+    async def authenticate(self, token: str, refresh: bool = True) -> str | None:
+        """
+        토큰 확인, user id 조회, 만료 시간 갱신을 한 번의 요청으로 처리하고, 갱신한 경우에만 index를 갱신합니다.
+        jwt access token은 서명과 폐기 목록만 확인하므로 보통 Redis 요청이 없습니다.
+        유효하지 않은 토큰이면 None을 반환합니다.
+        """
+        if self.is_jwt_mode and self._is_jwt(token):
+            claims = self._decode(token, "access")
+            if claims is None or await self._revocation.is_revoked(claims["sid"]):
+                return None
+            return claims["sub"]
+        if not token.isalnum():
+            return None
+
+        threshold = self.REFRESH_THRESHOLD.total_seconds() if refresh else 0
+        return await self._touch_session(
+            f"{self.KEY}:{token}", f"opaque:{token}", threshold
+        )
 
     async def exist_token(self, token: str) -> bool:
-        return await self.redis.exists(f"{self.KEY}:{token}")
+        return await self.authenticate(token, refresh=False) is not None
 
     async def delete_token(self, token: str) -> None:
+        if self._is_jwt(token):
+            claims = self._decode_unverified_exp(token)
+            if claims is None:
+                return
+            _login_log.info(f"Revoke session: {claims['sid']}")
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.delete(f"{self.JWT_SESSION_KEY}:{claims['sid']}")
+                pipe.zrem(f"{self.INDEX_KEY}:{claims['sub']}", f"jwt:{claims['sid']}")
+                await pipe.execute()
+            await self._revocation.revoke(claims["sid"])
+            return
         _login_log.info(f"Delete token: {token}")
-        await self.redis.delete(f"{self.KEY}:{token}")
+        user_id = await self.redis.get(f"{self.KEY}:{token}")
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(f"{self.KEY}:{token}")
+            if user_id:
+                pipe.zrem(
+                    f"{self.INDEX_KEY}:{user_id.decode('utf-8')}", f"opaque:{token}"
+                )
+            await pipe.execute()
+
+    async def _index_members(self, user_id: str) -> list[tuple[str, float]]:
+        index = f"{self.INDEX_KEY}:{user_id}"
+        await self.redis.zremrangebyscore(index, "-inf", time.time())
+        members = await self.redis.zrange(index, 0, -1, withscores=True)
+        return [(member.decode("utf-8"), score) for member, score in members]
+
+    async def list_sessions(self, user_id: str, current_token: str) -> list[dict]:
+        """
+        사용자의 활성 세션 목록을 반환합니다. 토큰 값 대신 식별용 해시만 노출합니다.
+        """
+        current = self._member(current_token)
+        return [
+            {
+                "id": hashlib.sha256(member.encode("utf-8")).hexdigest()[:16],
+                "type": member.split(":", 1)[0],
+                "expires_at": datetime.fromtimestamp(score, timezone.utc).isoformat(),
+                "current": member == current,
+            }
+            for member, score in await self._index_members(user_id)
+        ]
+
+    async def revoke_all(self, user_id: str, keep_token: str | None = None) -> int:
+        """
+        사용자의 모든 세션을 폐기하고 폐기한 세션 수를 반환합니다.
+        keep_token이 주어지면 해당 세션은 유지합니다.
+        """
+        keep = self._member(keep_token) if keep_token else None
+        members = [
+            member for member, _ in await self._index_members(user_id) if member != keep
+        ]
+        if not members:
+            return 0
+        _login_log.info(f"Revoke all sessions: {user_id}, {len(members)}")
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(*(self._member_key(member) for member in members))
+            pipe.zrem(f"{self.INDEX_KEY}:{user_id}", *members)
+            await pipe.execute()
+        session_ids = [
+            member.split(":", 1)[1] for member in members if member.startswith("jwt:")
+        ]
+        if session_ids:
+            await self._revocation.revoke_many(session_ids)
+        return len(members)
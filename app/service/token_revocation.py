@@ -0,0 +1,113 @@
+import asyncio
+import contextlib
+import time
+
+from sentry_sdk import capture_exception
+
+from app.core.bloom import BloomFilter
+from app.core.config import settings
+from app.core.pubsub import RedisPubSubHub
+from app.core.redis import manager
+from app.logger import use_logger
+
+_revocation_log = use_logger("token-revocation-service")
+
+
+class TokenRevocationService:
+    """
+    로그아웃 등으로 폐기된 세션 id 목록입니다.
+    Redis sorted set(score: 마지막 access token 만료 시각)이 원본이고,
+    각 워커는 이를 bloom filter로 들고 있다가 포함된 경우에만 Redis에서 확인합니다.
+    새로 폐기된 세션은 pub/sub으로 모든 워커의 filter에 추가됩니다.
+    """
+
+    KEY = "USER_SESSION_REVOKED"
+    CHANNEL = "USER_SESSION_REVOKED"
+
+    def __init__(self, pubsub: RedisPubSubHub) -> None:
+        self.redis = manager.get_connection()
+        self._pubsub = pubsub
+        self._filter = self._new_filter()
+        # filter를 다시 만드는 동안 추가된 세션 id
+        self._pending: list[str] | None = None
+        self._task: asyncio.Task | None = None
+
+    @staticmethod
+    def _new_filter() -> BloomFilter:
+        return BloomFilter.from_capacity(
+            settings.TOKEN_REVOCATION_CAPACITY, settings.TOKEN_REVOCATION_ERROR_RATE
+        )
+
+    def _add(self, session_id: str) -> None:
+        self._filter.add(session_id)
+        if self._pending is not None:
+            self._pending.append(session_id)
+
+    async def revoke(self, session_id: str) -> None:
+        await self.revoke_many([session_id])
+
+    async def revoke_many(self, session_ids: list[str]) -> None:
+        # 폐기 이전에 발급된 access token이 모두 만료될 때까지만 보관
+        expires_at = time.time() + settings.USER_ACCESS_TOKEN_TTL
+        for session_id in session_ids:
+            self._add(session_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zadd(self.KEY, dict.fromkeys(session_ids, expires_at))
+            for session_id in session_ids:
+                pipe.publish(self.CHANNEL, session_id)
+            await pipe.execute()
+
+    async def is_revoked(self, session_id: str) -> bool:
+        if session_id not in self._filter:
+            return False
+        expires_at = await self.redis.zscore(self.KEY, session_id)
+        return expires_at is not None and expires_at > time.time()
+
+    async def rebuild(self) -> None:
+        """
+        만료된 항목을 정리하고 Redis의 목록으로 filter를 다시 만듭니다.
+        """
+        now = time.time()
+        self._pending = []
+        try:
+            await self.redis.zremrangebyscore(self.KEY, "-inf", now)
+            members = await self.redis.zrangebyscore(self.KEY, now, "+inf")
+            revoked = self._new_filter()
+            for member in members:
+                revoked.add(member.decode("utf-8"))
+            for session_id in self._pending:
+                revoked.add(session_id)
+            self._filter = revoked
+        finally:
+            self._pending = None
+
+    async def _on_message(self, data: bytes) -> None:
+        self._add(data.decode("utf-8"))
+
+    async def _rebuild_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.USER_ACCESS_TOKEN_TTL)
+            try:
+                await self.rebuild()
+            except Exception as e:
+                capture_exception(e)
+                _revocation_log.error(f"Revocation filter rebuild failed: {e}")
+
+    def stats(self) -> dict:
+        return {"entries": self._filter.count, "bits": self._filter.size}
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        await self._pubsub.subscribe(self.CHANNEL, self._on_message)
+        self._pubsub.on_reconnect(self.rebuild)
+        await self.rebuild()
+        self._task = asyncio.create_task(self._rebuild_loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
@@ -0,0 +1,115 @@
+import copy
+import time
+from collections import OrderedDict
+
+from tortoise.signals import post_delete, post_save
+
+from app.core.pubsub import RedisPubSubHub
+from app.entity import User as UserEntity
+
+
+class UserCacheService:
+    """
+    User 행을 워커 메모리에 LRU + TTL로 캐싱합니다.
+    User가 저장되거나 삭제되면 Redis pub/sub으로 모든 워커의 캐시를 무효화합니다.
+    """
+
+    CHANNEL = "USER_CACHE_INVALIDATE"
+
+    def __init__(self, pubsub: RedisPubSubHub, max_size: int, ttl: float) -> None:
+        self._pubsub = pubsub
+        self.max_size = max_size
+        self.ttl = ttl
+        # user_id -> (만료 시각, DB 행 값)
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        # 무효화가 일어날 때마다 증가, DB 조회 중 무효화된 값을 저장하지 않기 위해 사용
+        self._epoch = 0
+        self._registered = False
+        self.counters = {"hit": 0, "miss": 0, "invalidated": 0, "evicted": 0}
+
+    @staticmethod
+    def _snapshot(user: UserEntity) -> dict:
+        # _init_from_db가 받는 DB 컬럼 이름으로 저장
+        return {
+            column: copy.deepcopy(getattr(user, field))
+            for field, column in UserEntity._meta.fields_db_projection.items()
+        }
+
+    def _lookup(self, user_id: str) -> UserEntity | None:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, row = entry
+        if expires_at <= time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        # 요청마다 새 인스턴스를 만들어 수정 내용이 캐시에 섞이지 않도록 함
+        return UserEntity._init_from_db(**copy.deepcopy(row))
+
+    def _store(self, user: UserEntity) -> None:
+        self._entries[str(user.id)] = (
+            time.monotonic() + self.ttl,
+            self._snapshot(user),
+        )
+        self._entries.move_to_end(str(user.id))
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.counters["evicted"] += 1
+
+    async def get(self, user_id: str) -> UserEntity | None:
+        user = self._lookup(str(user_id))
+        if user is not None:
+            self.counters["hit"] += 1
+            return user
+
+        self.counters["miss"] += 1
+        epoch = self._epoch
+        user = await UserEntity.get_or_none(id=user_id)
+        if user is not None and epoch == self._epoch:
+            self._store(user)
+        return user
+
+    def _invalidate_local(self, user_id: str) -> None:
+        self._epoch += 1
+        if self._entries.pop(user_id, None) is not None:
+            self.counters["invalidated"] += 1
+
+    async def invalidate(self, user_id: str) -> None:
+        self._invalidate_local(str(user_id))
+        await self._pubsub.publish(self.CHANNEL, str(user_id))
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self._entries.clear()
+
+    async def _on_message(self, data: bytes) -> None:
+        self._invalidate_local(data.decode("utf-8"))
+
+    async def _on_reconnect(self) -> None:
+        # 연결이 끊긴 동안의 무효화 메시지를 놓쳤을 수 있음
+        self.clear()
+
+    async def _on_save(self, sender, instance: UserEntity, *args, **kwargs) -> None:
+        await self.invalidate(str(instance.id))
+
+    async def _on_delete(self, sender, instance: UserEntity, *args, **kwargs) -> None:
+        await self.invalidate(str(instance.id))
+
+    async def start(self) -> None:
+        if self._registered:
+            return
+        self._registered = True
+        post_save(UserEntity)(self._on_save)
+        post_delete(UserEntity)(self._on_delete)
+        self._pubsub.on_reconnect(self._on_reconnect)
+        await self._pubsub.subscribe(self.CHANNEL, self._on_message)
+
+    def stats(self) -> dict:
+        lookups = self.counters["hit"] + self.counters["miss"]
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hit_ratio": round(self.counters["hit"] / lookups, 4) if lookups else 0.0,
+            **self.counters,
+        }
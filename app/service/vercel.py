@@ -1,10 +1,12 @@
 import contextlib
 from typing import ClassVar, Any
 
-from aiohttp import ClientSession, FormData
+from aiohttp import FormData
 
+from app.core.circuit import guards
 from app.core.config import settings
 from app.core.error import ErrorCode
+from app.core.http import HTTPSessionManager
 from app.core.response import APIError
 from app.logger import use_logger
 
@@ -23,14 +25,20 @@ def content_type(response: Any) -> Any:
 
 
 class VercelRequestService:
-    API: ClassVar[str] = f"https://api.vercel.com"
+    API: ClassVar[str] = settings.VERCEL_API_URL
 
-    def __init__(self) -> None:
-        self._session = ClientSession()
+    def __init__(self, http: HTTPSessionManager) -> None:
+        self._guard = guards.get("vercel")
+        self._session = http.session("vercel")
 
     async def request(self, method: str, path: str, **kwargs):
         url = f"{self.API}{path}"
-        async with self._session.request(method, url, **kwargs) as response:
+        async with (
+            self._guard.call() as call,
+            self._session.request(method, url, **kwargs) as response,
+        ):
+            if response.status >= 500:
+                call.fail()
             _http_log.debug(
                 "%s %s with %s has returned %s",
                 method,
@@ -0,0 +1,38 @@
+from json import loads
+
+from aiohttp import web
+
+from app.upstream_stub.cloudflare import CloudflareStub
+from app.upstream_stub.discord import DiscordStub
+from app.upstream_stub.fault import FaultInjector, FaultProfile
+from app.upstream_stub.mail import EmailStub, VercelStub
+
+
+def load_zones(path: str = "domain.json") -> dict[str, str]:
+    with open(path) as file:
+        domains = loads(file.read())["domains"]
+    return {value["zone_id"]: name for name, value in domains.items()}
+
+
+def create_app(
+    zones: dict[str, str],
+    fault: FaultProfile | None = None,
+    seed_records: int = 0,
+    discord_bucket_limit: int = 5,
+    discord_bucket_reset: float = 5.0,
+) -> web.Application:
+    """
+    Cloudflare, Discord, forwardemail, Vercel을 대신하는 가짜 upstream 서버입니다.
+    각 서비스는 /cloudflare, /discord, /email, /vercel 경로 아래에 있고,
+    /_stub/faults로 실행 중에 지연과 오류 비율을 바꿀 수 있습니다.
+    """
+    injector = FaultInjector(fault or FaultProfile())
+    app = web.Application(middlewares=[injector.middleware])
+    app["fault"] = injector
+
+    injector.setup(app)
+    CloudflareStub(zones, seed_records).setup(app, "/cloudflare")
+    DiscordStub(discord_bucket_limit, discord_bucket_reset).setup(app, "/discord")
+    EmailStub().setup(app, "/email")
+    VercelStub().setup(app, "/vercel")
+    return app
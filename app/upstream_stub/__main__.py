@@ -0,0 +1,62 @@
+import argparse
+
+from aiohttp import web
+
+from app.upstream_stub import create_app, load_zones
+from app.upstream_stub.fault import FaultProfile
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.upstream_stub",
+        description="부하 테스트용 가짜 Cloudflare/Discord/Email/Vercel 서버",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--domain-file", default="domain.json")
+    parser.add_argument(
+        "--records", type=int, default=0, help="zone마다 미리 만들어 둘 레코드 수"
+    )
+    parser.add_argument("--latency", type=float, default=0.0, help="응답 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="지연 편차(초)")
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="5xx 응답 비율 (0~1)"
+    )
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument(
+        "--throttle-rate", type=float, default=0.0, help="429 응답 비율 (0~1)"
+    )
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--discord-bucket-limit", type=int, default=5)
+    parser.add_argument("--discord-bucket-reset", type=float, default=5.0)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    app = create_app(
+        zones=load_zones(args.domain_file),
+        fault=FaultProfile(
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            error_status=args.error_status,
+            throttle_rate=args.throttle_rate,
+            retry_after=args.retry_after,
+        ),
+        seed_records=args.records,
+        discord_bucket_limit=args.discord_bucket_limit,
+        discord_bucket_reset=args.discord_bucket_reset,
+    )
+
+    base = f"http://{args.host}:{args.port}"
+    print("Set these environment variables on the backend:")
+    print(f"  CLOUDFLARE_API_URL={base}/cloudflare")
+    print(f"  DISCORD_API_URL={base}/discord")
+    print(f"  EMAIL_API_URL={base}/email")
+    print(f"  VERCEL_API_URL={base}/vercel")
+    web.run_app(app, host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
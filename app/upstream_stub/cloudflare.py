@@ -0,0 +1,198 @@
+import math
+import uuid
+from datetime import datetime, timezone
+
+from aiohttp import web
+
+MAX_PER_PAGE = 5000
+BATCH_OPERATIONS = ("deletes", "patches", "puts", "posts")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _envelope(result, **extra) -> dict:
+    return {"success": True, "errors": [], "messages": [], "result": result, **extra}
+
+
+def _error(status: int, message: str) -> web.Response:
+    return web.json_response(
+        {
+            "success": False,
+            "errors": [{"code": status, "message": message}],
+            "messages": [],
+            "result": None,
+        },
+        status=status,
+    )
+
+
+class CloudflareStub:
+    """
+    CloudflareRequestService가 사용하는 zone, DNS 레코드, batch API를 메모리에서 흉내냅니다.
+    """
+
+    def __init__(self, zones: dict[str, str], seed_records: int = 0) -> None:
+        # zone_id -> zone name
+        self.zones = zones
+        # zone_id -> record_id -> record
+        self.records: dict[str, dict[str, dict]] = {zone_id: {} for zone_id in zones}
+        for zone_id, zone_name in zones.items():
+            for index in range(seed_records):
+                self._insert(
+                    zone_id,
+                    {
+                        "type": "A",
+                        "name": f"seed-{index}.{zone_name}",
+                        "content": "192.0.2.1",
+                        "comment": None,
+                    },
+                )
+
+    def _insert(self, zone_id: str, data: dict) -> dict:
+        record = {
+            "id": uuid.uuid4().hex,
+            "zone_id": zone_id,
+            "zone_name": self.zones[zone_id],
+            "type": data.get("type", "A"),
+            "name": data["name"].lower(),
+            "content": data.get("content", ""),
+            "ttl": data.get("ttl", 1),
+            "proxied": data.get("proxied", False),
+            "comment": data.get("comment"),
+            "created_on": _now(),
+            "modified_on": _now(),
+        }
+        self.records[zone_id][record["id"]] = record
+        return record
+
+    def _patch(self, zone_id: str, record_id: str, data: dict) -> dict | None:
+        record = self.records[zone_id].get(record_id)
+        if record is None:
+            return None
+        for key, value in data.items():
+            if key in ("id", "zone_id", "zone_name", "created_on"):
+                continue
+            record[key] = value.lower() if key == "name" else value
+        record["modified_on"] = _now()
+        return record
+
+    def _zone(self, request: web.Request) -> str | None:
+        zone_id = request.match_info["zone_id"]
+        return zone_id if zone_id in self.records else None
+
+    async def list_zones(self, request: web.Request) -> web.Response:
+        zones = [
+            {"id": zone_id, "name": name, "status": "active"}
+            for zone_id, name in self.zones.items()
+        ]
+        return web.json_response(
+            _envelope(
+                zones,
+                result_info={
+                    "page": 1,
+                    "per_page": len(zones),
+                    "count": len(zones),
+                    "total_count": len(zones),
+                    "total_pages": 1,
+                },
+            )
+        )
+
+    async def list_records(self, request: web.Request) -> web.Response:
+        zone_id = self._zone(request)
+        if zone_id is None:
+            return _error(404, "zone not found")
+
+        query = request.query
+        try:
+            page = max(1, int(query.get("page", 1)))
+            per_page = min(MAX_PER_PAGE, max(1, int(query.get("per_page", 100))))
+        except ValueError:
+            return _error(400, "invalid pagination")
+
+        records = list(self.records[zone_id].values())
+        if "name" in query:
+            records = [r for r in records if r["name"] == query["name"].lower()]
+        if "type" in query:
+            records = [r for r in records if r["type"] == query["type"]]
+        if "content" in query:
+            records = [r for r in records if r["content"] == query["content"]]
+
+        total = len(records)
+        start = (page - 1) * per_page
+        result = records[start : start + per_page]
+        return web.json_response(
+            _envelope(
+                result,
+                result_info={
+                    "page": page,
+                    "per_page": per_page,
+                    "count": len(result),
+                    "total_count": total,
+                    "total_pages": max(1, math.ceil(total / per_page)),
+                },
+            )
+        )
+
+    async def create_record(self, request: web.Request) -> web.Response:
+        zone_id = self._zone(request)
+        if zone_id is None:
+            return _error(404, "zone not found")
+        data = await request.json()
+        if not data.get("name"):
+            return _error(400, "name is required")
+        return web.json_response(_envelope(self._insert(zone_id, data)))
+
+    async def update_record(self, request: web.Request) -> web.Response:
+        zone_id = self._zone(request)
+        if zone_id is None:
+            return _error(404, "zone not found")
+        record = self._patch(
+            zone_id, request.match_info["record_id"], await request.json()
+        )
+        if record is None:
+            return _error(404, "record not found")
+        return web.json_response(_envelope(record))
+
+    async def delete_record(self, request: web.Request) -> web.Response:
+        zone_id = self._zone(request)
+        if zone_id is None:
+            return _error(404, "zone not found")
+        record = self.records[zone_id].pop(request.match_info["record_id"], None)
+        if record is None:
+            return _error(404, "record not found")
+        return web.json_response(_envelope({"id": record["id"]}))
+
+    async def batch(self, request: web.Request) -> web.Response:
+        zone_id = self._zone(request)
+        if zone_id is None:
+            return _error(404, "zone not found")
+        body = await request.json()
+
+        # 실제 API처럼 하나라도 실패하면 묶음 전체를 적용하지 않음
+        for item in body.get("deletes", []) + body.get("patches", []):
+            if item.get("id") not in self.records[zone_id]:
+                return _error(400, f"record {item.get('id')} not found")
+        for item in body.get("posts", []):
+            if not item.get("name"):
+                return _error(400, "name is required")
+
+        result = {operation: [] for operation in BATCH_OPERATIONS}
+        for item in body.get("deletes", []):
+            result["deletes"].append(self.records[zone_id].pop(item["id"]))
+        for item in body.get("patches", []):
+            result["patches"].append(self._patch(zone_id, item["id"], item))
+        for item in body.get("posts", []):
+            result["posts"].append(self._insert(zone_id, item))
+        return web.json_response(_envelope(result))
+
+    def setup(self, app: web.Application, prefix: str) -> None:
+        records = f"{prefix}/zones/{{zone_id}}/dns_records"
+        app.router.add_get(f"{prefix}/zones", self.list_zones)
+        app.router.add_get(records, self.list_records)
+        app.router.add_post(records, self.create_record)
+        app.router.add_post(f"{records}/batch", self.batch)
+        app.router.add_patch(f"{records}/{{record_id}}", self.update_record)
+        app.router.add_delete(f"{records}/{{record_id}}", self.delete_record)
@@ -0,0 +1,168 @@
+import itertools
+import json
+import time
+from datetime import datetime, timezone
+
+from aiohttp import web
+
+APPLICATION_ID = "100000000000000001"
+GUILD_ID = "100000000000000002"
+
+BOT_USER = {
+    "id": APPLICATION_ID,
+    "username": "stub-bot",
+    "global_name": None,
+    "discriminator": "0",
+    "avatar": None,
+    "bot": True,
+}
+
+
+def _json(data: dict, status: int = 200, headers: dict | None = None) -> web.Response:
+    # discord.py는 Content-Type이 정확히 application/json일 때만 JSON으로 해석함
+    return web.Response(
+        body=json.dumps(data).encode(),
+        status=status,
+        headers=headers,
+        content_type="application/json",
+    )
+
+
+class DiscordStub:
+    """
+    DiscordRequester가 사용하는 로그인, 채널 메시지, interaction/webhook API를 흉내냅니다.
+    응답에는 Discord와 같은 rate limit 헤더가 포함됩니다.
+    """
+
+    def __init__(self, bucket_limit: int = 5, bucket_reset: float = 5.0) -> None:
+        self.bucket_limit = bucket_limit
+        self.bucket_reset = bucket_reset
+        self._snowflakes = itertools.count(200000000000000000)
+        # bucket -> (남은 요청 수, 초기화 시각)
+        self._buckets: dict[str, tuple[int, float]] = {}
+
+    def _snowflake(self) -> str:
+        return str(next(self._snowflakes))
+
+    def _consume(self, bucket: str) -> tuple[bool, dict[str, str]]:
+        now = time.time()
+        remaining, reset_at = self._buckets.get(bucket, (self.bucket_limit, 0.0))
+        if reset_at <= now:
+            remaining, reset_at = self.bucket_limit, now + self.bucket_reset
+        allowed = remaining > 0
+        remaining = max(0, remaining - 1)
+        self._buckets[bucket] = (remaining, reset_at)
+        return allowed, {
+            "X-RateLimit-Limit": str(self.bucket_limit),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": f"{reset_at:.3f}",
+            "X-RateLimit-Reset-After": f"{max(0.0, reset_at - now):.3f}",
+            "X-RateLimit-Bucket": bucket,
+        }
+
+    def _respond(self, bucket: str, channel_id: str, payload: dict) -> web.Response:
+        allowed, headers = self._consume(bucket)
+        if not allowed:
+            retry_after = headers["X-RateLimit-Reset-After"]
+            return _json(
+                {
+                    "message": "You are being rate limited.",
+                    "retry_after": float(retry_after),
+                    "global": False,
+                },
+                status=429,
+                headers={**headers, "Retry-After": retry_after},
+            )
+        return _json(self._message(channel_id, payload), headers=headers)
+
+    def _message(self, channel_id: str, payload: dict) -> dict:
+        return {
+            "id": self._snowflake(),
+            "channel_id": channel_id,
+            "author": BOT_USER,
+            "content": payload.get("content") or "",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "edited_timestamp": None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": [],
+            "mention_roles": [],
+            "attachments": [],
+            "embeds": payload.get("embeds") or [],
+            "components": payload.get("components") or [],
+            "pinned": False,
+            "type": 0,
+            "flags": payload.get("flags") or 0,
+        }
+
+    async def get_me(self, request: web.Request) -> web.Response:
+        return _json(BOT_USER)
+
+    async def get_application(self, request: web.Request) -> web.Response:
+        return _json(
+            {
+                "id": APPLICATION_ID,
+                "name": "stub-bot",
+                "description": "",
+                "icon": None,
+                "bot_public": False,
+                "bot_require_code_grant": False,
+                "owner": BOT_USER,
+                "verify_key": "00" * 32,
+                "flags": 0,
+            }
+        )
+
+    async def get_channel(self, request: web.Request) -> web.Response:
+        channel_id = request.match_info["channel_id"]
+        return _json(
+            {
+                "id": channel_id,
+                "type": 0,
+                "guild_id": GUILD_ID,
+                "name": f"stub-{channel_id}",
+                "position": 0,
+                "permission_overwrites": [],
+                "nsfw": False,
+                "parent_id": None,
+                "topic": None,
+                "last_message_id": None,
+                "rate_limit_per_user": 0,
+            }
+        )
+
+    async def create_message(self, request: web.Request) -> web.Response:
+        channel_id = request.match_info["channel_id"]
+        payload = await request.json()
+        return self._respond(f"channel-{channel_id}", channel_id, payload)
+
+    async def interaction_callback(self, request: web.Request) -> web.Response:
+        await request.read()
+        return web.Response(status=204)
+
+    async def execute_webhook(self, request: web.Request) -> web.Response:
+        token = request.match_info["token"]
+        payload = await request.json()
+        return self._respond(f"webhook-{token}", GUILD_ID, payload)
+
+    async def edit_webhook_message(self, request: web.Request) -> web.Response:
+        token = request.match_info["token"]
+        payload = await request.json()
+        return self._respond(f"webhook-{token}", GUILD_ID, payload)
+
+    def setup(self, app: web.Application, prefix: str) -> None:
+        webhook = f"{prefix}/webhooks/{{application_id}}/{{token}}"
+        app.router.add_get(f"{prefix}/users/@me", self.get_me)
+        app.router.add_get(f"{prefix}/oauth2/applications/@me", self.get_application)
+        app.router.add_get(f"{prefix}/channels/{{channel_id}}", self.get_channel)
+        app.router.add_post(
+            f"{prefix}/channels/{{channel_id}}/messages", self.create_message
+        )
+        app.router.add_post(
+            f"{prefix}/interactions/{{interaction_id}}/{{token}}/callback",
+            self.interaction_callback,
+        )
+        app.router.add_post(webhook, self.execute_webhook)
+        app.router.add_patch(
+            f"{webhook}/messages/{{message_id}}", self.edit_webhook_message
+        )
@@ -0,0 +1,124 @@
+import asyncio
+import random
+from collections import Counter
+
+from aiohttp import web
+
+
+class FaultProfile:
+    """
+    가짜 upstream 하나의 응답 지연과 오류 비율입니다.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        throttle_rate: float = 0.0,
+        retry_after: float = 1.0,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+
+    def update(self, data: dict) -> None:
+        for key, value in data.items():
+            if not hasattr(self, key):
+                raise KeyError(key)
+            setattr(self, key, type(getattr(self, key))(value))
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+    def delay(self) -> float:
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+
+class FaultInjector:
+    """
+    경로의 첫 부분(/cloudflare, /discord ...)으로 upstream을 구분하여
+    지연, 429, 5xx 응답을 주입하고 요청 수를 기록합니다.
+    """
+
+    CONTROL_PREFIX = "_stub"
+
+    def __init__(self, default: FaultProfile) -> None:
+        self.default = default
+        self.profiles: dict[str, FaultProfile] = {}
+        self.counters: Counter[str] = Counter()
+
+    def profile(self, service: str) -> FaultProfile:
+        return self.profiles.get(service, self.default)
+
+    @web.middleware
+    async def middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        service = request.path.strip("/").split("/", 1)[0]
+        if service == self.CONTROL_PREFIX:
+            return await handler(request)
+
+        profile = self.profile(service)
+        self.counters[f"{service}.requests"] += 1
+        delay = profile.delay()
+        if delay:
+            await asyncio.sleep(delay)
+
+        if profile.throttle_rate and random.random() < profile.throttle_rate:
+            self.counters[f"{service}.throttled"] += 1
+            return web.json_response(
+                {"message": "You are being rate limited.", "retry_after": 1},
+                status=429,
+                headers={"Retry-After": str(profile.retry_after)},
+            )
+        if profile.error_rate and random.random() < profile.error_rate:
+            self.counters[f"{service}.errors"] += 1
+            return web.json_response(
+                {"success": False, "errors": [{"message": "injected failure"}]},
+                status=profile.error_status,
+            )
+        return await handler(request)
+
+    async def get_faults(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "default": self.default.to_dict(),
+                **{name: value.to_dict() for name, value in self.profiles.items()},
+            }
+        )
+
+    async def update_faults(self, request: web.Request) -> web.Response:
+        """
+        {"default": {...}, "cloudflare": {"latency": 0.2}} 형태로 실행 중에 변경합니다.
+        """
+        body = await request.json()
+        try:
+            for service, data in body.items():
+                if service == "default":
+                    self.default.update(data)
+                else:
+                    profile = self.profiles.get(service)
+                    if profile is None:
+                        profile = FaultProfile(**self.default.to_dict())
+                        self.profiles[service] = profile
+                    profile.update(data)
+        except (KeyError, TypeError, ValueError) as e:
+            return web.json_response({"error": f"invalid field: {e}"}, status=400)
+        return await self.get_faults(request)
+
+    async def get_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(dict(self.counters))
+
+    async def reset_stats(self, request: web.Request) -> web.Response:
+        self.counters.clear()
+        return web.json_response({})
+
+    def setup(self, app: web.Application) -> None:
+        prefix = f"/{self.CONTROL_PREFIX}"
+        app.router.add_get(f"{prefix}/faults", self.get_faults)
+        app.router.add_put(f"{prefix}/faults", self.update_faults)
+        app.router.add_get(f"{prefix}/stats", self.get_stats)
+        app.router.add_delete(f"{prefix}/stats", self.reset_stats)
@@ -0,0 +1,77 @@
+import uuid
+from datetime import datetime, timezone
+
+from aiohttp import web
+
+
+class EmailStub:
+    """
+    forwardemail의 메일 발송 API를 흉내냅니다. 실제로 메일을 보내지 않습니다.
+    """
+
+    def __init__(self) -> None:
+        self.sent = 0
+
+    async def send_email(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        if not payload.get("to") or not payload.get("from"):
+            return web.json_response(
+                {"statusCode": 400, "message": "from and to are required"},
+                status=400,
+            )
+        self.sent += 1
+        return web.json_response(
+            {
+                "id": uuid.uuid4().hex,
+                "status": "queued",
+                "envelope": {"from": payload["from"], "to": [payload["to"]]},
+                "subject": payload.get("subject"),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }
+        )
+
+    def setup(self, app: web.Application, prefix: str) -> None:
+        app.router.add_post(f"{prefix}/emails", self.send_email)
+
+
+class VercelStub:
+    """
+    Vercel integration 콜백에서 사용하는 OAuth, 사용자, 프로젝트 API를 흉내냅니다.
+    """
+
+    async def access_token(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        if not form.get("code"):
+            return web.json_response({"error": "invalid_grant"}, status=400)
+        return web.json_response(
+            {
+                "token_type": "Bearer",
+                "access_token": f"stub-{uuid.uuid4().hex}",
+                "installation_id": "icfg_stub",
+                "user_id": "stub-user",
+                "team_id": None,
+            }
+        )
+
+    async def current_user(self, request: web.Request) -> web.Response:
+        user = {
+            "id": "stub-user",
+            "email": "stub@example.com",
+            "name": "Stub User",
+            "username": "stub",
+        }
+        # 콜백 라우터는 최상위의 user_id 등을 읽으므로 함께 반환
+        return web.json_response({"user": user, "user_id": user["id"], **user})
+
+    async def projects(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "projects": [{"id": "prj_stub", "name": "stub-project"}],
+                "pagination": {"count": 1, "next": None, "prev": None},
+            }
+        )
+
+    def setup(self, app: web.Application, prefix: str) -> None:
+        app.router.add_post(f"{prefix}/v2/oauth/access_token", self.access_token)
+        app.router.add_get(f"{prefix}/v2/user", self.current_user)
+        app.router.add_get(f"{prefix}/v1/projects", self.projects)
@@ -0,0 +1,361 @@
+"""
+주요 API의 부하 테스트 스크립트입니다.
+
+로컬 Postgres, Redis와 가짜 upstream(python -m app.upstream_stub)을 띄운 서버를 대상으로
+시나리오마다 지정한 동시 접속 수로 요청을 보내고 p50/p95/p99 지연 시간, 처리량, 오류 비율을
+JSON으로 저장합니다. 테스트 사용자와 토큰은 서버와 같은 .env 설정으로 DB/Redis에 직접 생성합니다.
+
+    python test/loadtest.py --concurrency 32 --duration 30 --output result.json
+    python test/loadtest.py --compare baseline.json --output result.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+import aiohttp
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+SCENARIOS = ("status", "login_session", "exist", "domains", "tickets", "register")
+
+
+class ScenarioResult:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.latencies: list[float] = []
+        self.status_codes: Counter[str] = Counter()
+        self.exceptions: Counter[str] = Counter()
+        self.elapsed = 0.0
+
+    def record(self, latency: float, status: int | None, error: str | None) -> None:
+        self.latencies.append(latency)
+        if error:
+            self.exceptions[error] += 1
+        else:
+            self.status_codes[str(status)] += 1
+
+    @staticmethod
+    def _percentile(values: list[float], percent: float) -> float:
+        if not values:
+            return 0.0
+        index = min(len(values) - 1, max(0, round(percent / 100 * len(values)) - 1))
+        return values[index]
+
+    def summary(self) -> dict:
+        latencies = sorted(self.latencies)
+        total = len(latencies)
+        server_errors = sum(
+            count for status, count in self.status_codes.items() if int(status) >= 500
+        )
+        errors = server_errors + sum(self.exceptions.values())
+        rate_limited = self.status_codes.get("429", 0)
+        return {
+            "requests": total,
+            "duration": round(self.elapsed, 3),
+            "throughput": round(total / self.elapsed, 2) if self.elapsed else 0.0,
+            "latency_ms": {
+                "mean": round(sum(latencies) / total * 1000, 2) if total else 0.0,
+                "p50": round(self._percentile(latencies, 50) * 1000, 2),
+                "p95": round(self._percentile(latencies, 95) * 1000, 2),
+                "p99": round(self._percentile(latencies, 99) * 1000, 2),
+                "max": round(latencies[-1] * 1000, 2) if total else 0.0,
+            },
+            "errors": errors,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "rate_limited": rate_limited,
+            "status_codes": dict(self.status_codes),
+            "exceptions": dict(self.exceptions),
+        }
+
+
+async def warm_up(request, session: aiohttp.ClientSession) -> None:
+    # 커넥션 생성과 서버 쪽 첫 요청 비용이 결과에 섞이지 않도록 한 번 먼저 요청
+    try:
+        async with request(session) as response:
+            await response.read()
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        pass
+
+
+class LoadTest:
+    def __init__(self, args: argparse.Namespace, tokens: list[str]) -> None:
+        self.args = args
+        self.base_url = args.base_url.rstrip("/")
+        self.tokens = tokens
+        self._counter = 0
+
+    def _next(self) -> int:
+        self._counter += 1
+        return self._counter
+
+    def _auth(self) -> dict:
+        token = self.tokens[self._next() % len(self.tokens)]
+        return {"Authorization": f"Bearer {token}"}
+
+    def _request_factory(
+        self, name: str
+    ) -> Callable[[aiohttp.ClientSession], Awaitable[aiohttp.ClientResponse]]:
+        domain = self.args.domain
+        run_id = uuid.uuid4().hex[:6]
+
+        def status(session):
+            return session.get(f"{self.base_url}/status")
+
+        def login_session(session):
+            return session.post(f"{self.base_url}/auth/login/session", json={})
+
+        def exist(session):
+            # 미리 만든 레코드와 없는 이름을 번갈아 조회
+            index = self._next()
+            name = f"seed-{index % 1000}" if index % 2 else f"lt-{run_id}-{index}"
+            return session.get(
+                f"{self.base_url}/domain/exist",
+                params={"name": f"{name}.{domain}"},
+                headers=self._auth(),
+            )
+
+        def domains(session):
+            return session.get(f"{self.base_url}/domain/", headers=self._auth())
+
+        def tickets(session):
+            return session.get(
+                f"{self.base_url}/domain/tickets",
+                params={"ticket_filter": "pending"},
+                headers=self._auth(),
+            )
+
+        def register(session):
+            return session.post(
+                f"{self.base_url}/domain/register",
+                json={
+                    "name": f"lt-{run_id}-{self._next()}.{domain}",
+                    "type": "A",
+                    "content": "192.0.2.10",
+                    "proxied": False,
+                    "ttl": 1,
+                },
+                headers=self._auth(),
+            )
+
+        return {
+            "status": status,
+            "login_session": login_session,
+            "exist": exist,
+            "domains": domains,
+            "tickets": tickets,
+            "register": register,
+        }[name]
+
+    async def run_scenario(
+        self, session: aiohttp.ClientSession, name: str
+    ) -> ScenarioResult:
+        result = ScenarioResult(name)
+        request = self._request_factory(name)
+        deadline = time.monotonic() + self.args.duration
+        remaining = self.args.requests
+
+        async def worker() -> None:
+            nonlocal remaining
+            while time.monotonic() < deadline:
+                if self.args.requests:
+                    if remaining <= 0:
+                        return
+                    remaining -= 1
+                started = time.perf_counter()
+                try:
+                    async with request(session) as response:
+                        await response.read()
+                        result.record(
+                            time.perf_counter() - started, response.status, None
+                        )
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    result.record(time.perf_counter() - started, None, type(e).__name__)
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker() for _ in range(self.args.concurrency)))
+        result.elapsed = time.monotonic() - started
+        return result
+
+    async def run(self) -> dict[str, dict]:
+        connector = aiohttp.TCPConnector(limit=self.args.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.args.timeout)
+        results = {}
+        async with aiohttp.ClientSession(
+            connector=connector, timeout=timeout
+        ) as session:
+            for name in self.args.scenarios:
+                if self.args.warmup:
+                    await warm_up(self._request_factory(name), session)
+                result = await self.run_scenario(session, name)
+                results[name] = result.summary()
+                print_summary(name, results[name])
+        return results
+
+
+async def init_database() -> None:
+    # 서버와 같은 .env 설정을 사용하도록 앱 모듈은 필요할 때 import
+    from tortoise import Tortoise, generate_config
+
+    from app.core.config import settings
+
+    await Tortoise.init(
+        config=generate_config(
+            settings.DATABASE_URI,
+            app_modules={"models": ["app.entity"]},
+            connection_label="models",
+        )
+    )
+
+
+async def seed_users(count: int) -> tuple[list[str], list[str]]:
+    from tortoise import Tortoise
+
+    from app.entity import User
+    from app.service.container import ServiceContainer
+
+    await init_database()
+    await Tortoise.generate_schemas()
+    user_session = ServiceContainer().user_session()
+    user_ids, tokens = [], []
+    for index in range(count):
+        user = await User.create(
+            nickname=f"loadtest-{index}",
+            email=f"loadtest-{index}@loadtest.invalid",
+            avatar="https://example.com/avatar.png",
+        )
+        user_ids.append(str(user.id))
+        tokens.append(await user_session.create_new_token(str(user.id)))
+    await Tortoise.close_connections()
+    return user_ids, tokens
+
+
+async def cleanup_users(user_ids: list[str], tokens: list[str]) -> None:
+    from tortoise import Tortoise
+
+    from app.entity import User
+    from app.service.container import ServiceContainer
+
+    await init_database()
+    for user in await User.filter(id__in=user_ids).prefetch_related("tickets"):
+        for ticket in user.tickets:
+            await ticket.delete()
+        await user.delete()
+    user_session = ServiceContainer().user_session()
+    for token in tokens:
+        await user_session.delete_token(token)
+    await Tortoise.close_connections()
+
+
+def print_summary(name: str, summary: dict) -> None:
+    latency = summary["latency_ms"]
+    print(
+        f"{name:<14} {summary['requests']:>7} req  {summary['throughput']:>8.1f} req/s  "
+        f"p50 {latency['p50']:>7.1f}ms  p95 {latency['p95']:>7.1f}ms  "
+        f"p99 {latency['p99']:>7.1f}ms  err {summary['error_rate'] * 100:>5.1f}%  "
+        f"429 {summary['rate_limited']}"
+    )
+
+
+def compare(previous: dict, current: dict) -> None:
+    print("\n비교 기준:", previous["meta"].get("commit"))
+    for name, summary in current["results"].items():
+        base = previous["results"].get(name)
+        if base is None:
+            continue
+
+        def delta(new: float, old: float) -> str:
+            if not old:
+                return "    n/a"
+            return f"{(new - old) / old * 100:+6.1f}%"
+
+        print(
+            f"{name:<14} throughput {delta(summary['throughput'], base['throughput'])}  "
+            f"p95 {delta(summary['latency_ms']['p95'], base['latency_ms']['p95'])}  "
+            f"p99 {delta(summary['latency_ms']['p99'], base['latency_ms']['p99'])}  "
+            f"error_rate {base['error_rate']:.4f} -> {summary['error_rate']:.4f}"
+        )
+
+
+def current_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="API 부하 테스트")
+    parser.add_argument("--base-url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--domain", default="sunrin.kr")
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=SCENARIOS,
+        default=list(SCENARIOS),
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--duration", type=float, default=15, help="시나리오별 시간(초)"
+    )
+    parser.add_argument(
+        "--requests", type=int, default=0, help="시나리오별 최대 요청 수 (0은 무제한)"
+    )
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--users", type=int, default=20, help="생성할 테스트 사용자 수")
+    parser.add_argument(
+        "--token", action="append", default=[], help="이미 발급된 토큰 사용 (생성 생략)"
+    )
+    parser.add_argument("--no-warmup", dest="warmup", action="store_false")
+    parser.add_argument("--keep-users", action="store_true")
+    parser.add_argument("--output", default="loadtest-result.json")
+    parser.add_argument("--compare", help="이전 결과 JSON 파일과 비교")
+    return parser.parse_args()
+
+
+async def run() -> None:
+    args = parse_args()
+    user_ids, tokens = [], args.token
+    if not tokens:
+        user_ids, tokens = await seed_users(args.users)
+        print(f"테스트 사용자 {len(user_ids)}명을 생성했습니다.")
+
+    try:
+        results = await LoadTest(args, tokens).run()
+    finally:
+        if user_ids and not args.keep_users:
+            await cleanup_users(user_ids, tokens)
+
+    report = {
+        "meta": {
+            "commit": current_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "base_url": args.base_url,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "requests": args.requests,
+            "users": len(tokens),
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2, ensure_ascii=False)
+    print(f"\n결과를 {args.output}에 저장했습니다.")
+
+    if args.compare:
+        with open(args.compare) as file:
+            compare(json.load(file), report)
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,65 @@
+"""
+같은 티켓을 두 번 승인하거나 승인된 티켓을 거절해도 한 번만 처리되는지 확인합니다.
+
+서버와 같은 .env 설정이 필요하며, DB는 메모리 SQLite를 사용합니다.
+
+    python -m pytest test/test_ticket_approval.py
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+from tortoise import Tortoise
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.entity import Domain, DomainTicket, User
+from app.entity.ticket import DomainTicketStatus
+from app.service.domain import DomainService
+
+
+class TicketApprovalTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        await Tortoise.init(
+            db_url="sqlite://:memory:", modules={"models": ["app.entity"]}
+        )
+        await Tortoise.generate_schemas()
+        self.user = await User.create(
+            nickname="test", email="test@example.com", avatar=""
+        )
+        self.ticket = await DomainTicket.create(
+            name="test", content="1.1.1.1", record_type="A", ttl="1"
+        )
+        await self.user.tickets.add(self.ticket)
+
+    async def asyncTearDown(self) -> None:
+        await Tortoise.close_connections()
+
+    async def test_approve_twice(self) -> None:
+        results = await asyncio.gather(
+            DomainService.approved_ticket(str(self.ticket.id)),
+            DomainService.approved_ticket(str(self.ticket.id)),
+        )
+        self.assertEqual(sum(result is not None for result in results), 1)
+        self.assertEqual(await Domain.all().count(), 1)
+        self.assertIsNone(await DomainService.approved_ticket(str(self.ticket.id)))
+        await self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.status, DomainTicketStatus.APPROVED)
+
+    async def test_reject_after_approve(self) -> None:
+        self.assertIsNotNone(await DomainService.approved_ticket(str(self.ticket.id)))
+        self.assertIsNone(await DomainService.reject_ticket(str(self.ticket.id)))
+        await self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.status, DomainTicketStatus.APPROVED)
+
+    async def test_approve_after_rollback(self) -> None:
+        ticket, domain = await DomainService.approved_ticket(str(self.ticket.id))
+        await DomainService.rollback_approved_ticket(ticket, domain, self.user)
+        self.assertIsNotNone(await DomainService.approved_ticket(str(self.ticket.id)))
+        self.assertEqual(await Domain.all().count(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()